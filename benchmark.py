@@ -0,0 +1,255 @@
+"""
+Benchmark suite for the game engine and the AI.
+
+Records seeded games with simulate.play_game, then times their replay
+(every add_knowledge call of the game), MinesweeperAI.propagate,
+Minesweeper.flood_fill_reveal and full games on standard board sizes,
+and writes the results as JSON so runs from two commits can be compared.
+The AI options (--bitsets, --compact, --guess) apply to every benchmark.
+
+Usage:
+    python benchmark.py -o before.json
+    python benchmark.py -o after.json
+    python benchmark.py --compare before.json after.json
+"""
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+
+from csp import GUESS_STRATEGIES
+from recording import GameRecorder, load_game, play_entry, replay
+from simulate import game_rng, play_game
+
+# name: (height, width, mines)
+PRESETS = {
+    "beginner": (9, 9, 10),
+    "intermediate": (16, 16, 40),
+    "expert": (16, 30, 99),
+    "large": (200, 200, 6000),
+    "huge": (500, 500, 37500),
+}
+
+# Recorded move entries queued before timing propagate()
+PROPAGATE_QUEUE = 8
+
+# Games per preset used for the full-game and replay benchmarks
+GAMES = {
+    "beginner": 200,
+    "intermediate": 50,
+    "expert": 20,
+    "large": 1,
+    "huge": 1,
+}
+
+
+def record_game(height, width, mines, seed, index, ai_options=None):
+    """
+    Plays one seeded game with simulate.play_game and returns its
+    recording.GameRecord.
+    """
+    recorder = GameRecorder(seed, index)
+    play_game(height, width, mines, game_rng(seed, index), ai_options=ai_options,
+              recorder=recorder)
+    return recorder.record
+
+
+def queued_propagate(record, ai_options, half, queue):
+    """
+    Replays the first `half` entries of a recorded game, then plays the
+    next `queue` entries with propagate() held back so that their
+    sentences are only queued. Returns the AI, ready for one propagate()
+    over the queue.
+    """
+    game, ai = load_game(record, ai_options)
+    revealed = set()
+    flags = set()
+    for entry in record.moves[:half]:
+        play_entry(game, ai, entry, revealed, flags)
+    ai.propagate = lambda: None
+    for entry in record.moves[half:half + queue]:
+        play_entry(game, ai, entry, revealed, flags)
+    del ai.propagate
+    return ai
+
+
+def timed(samples):
+    """
+    Summarizes a list of durations in seconds. An empty list (e.g. with
+    --games 0) gives a summary of zeros.
+    """
+    samples = sorted(samples)
+    if not samples:
+        return {"runs": 0, "total": 0.0, "mean": 0.0, "median": 0.0, "min": 0.0}
+    return {
+        "runs": len(samples),
+        "total": sum(samples),
+        "mean": sum(samples) / len(samples),
+        "median": samples[len(samples) // 2],
+        "min": samples[0],
+    }
+
+
+def bench_preset(name, seed, repeat, games=None, ai_options=None):
+    height, width, mines = PRESETS[name]
+    if games is None:
+        games = GAMES[name]
+    recorded = [record_game(height, width, mines, seed, i, ai_options) for i in range(games)]
+    results = {}
+
+    # replay: each recorded game's moves fed to a fresh board and AI, so
+    # every add_knowledge and add_knowledge_bulk call of the game runs
+    samples = []
+    for _ in range(repeat):
+        for record in recorded:
+            samples.append(replay(record, ai_options).seconds)
+    entries = sum(len(record.moves) for record in recorded)
+    results["replay"] = timed(samples)
+    results["replay"]["entries_per_game"] = entries / games if games else 0.0
+
+    # propagate on a mid-game knowledge base: the next entries are
+    # queued without inference and propagate() runs once over the queue
+    samples = []
+    for _ in range(repeat):
+        for record in recorded:
+            ai = queued_propagate(record, ai_options, len(record.moves) // 2,
+                                  PROPAGATE_QUEUE)
+            start = time.perf_counter()
+            ai.propagate()
+            samples.append(time.perf_counter() - start)
+    results["propagate"] = timed(samples)
+
+    # flood_fill_reveal from the opening click of each game
+    samples = []
+    for _ in range(repeat):
+        for record in recorded:
+            if not record.moves:
+                continue
+            entry = record.moves[0]
+            cell = divmod(entry[0] if isinstance(entry, list) else entry, width)
+            game, ai = load_game(record, ai_options)
+            start = time.perf_counter()
+            game.flood_fill_reveal(cell, ai, set(), set())
+            samples.append(time.perf_counter() - start)
+    results["flood_fill_reveal"] = timed(samples)
+
+    # Full games end to end
+    samples = []
+    wins = 0
+    for r in range(repeat):
+        for i in range(games):
+            result = play_game(height, width, mines, game_rng(seed, i),
+                               ai_options=ai_options)
+            samples.append(result.seconds)
+            wins += result.won
+    results["full_game"] = timed(samples)
+    results["full_game"]["win_rate"] = wins / (games * repeat) if games * repeat else 0.0
+
+    return {"height": height, "width": width, "mines": mines,
+            "games": games, "benchmarks": results}
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(presets, seed=0, repeat=3, games=None, ai_options=None):
+    report = {
+        "meta": {
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "seed": seed,
+            "repeat": repeat,
+            "ai_options": ai_options or {},
+        },
+        "presets": {},
+    }
+    for name in presets:
+        print(f"Running {name}...", file=sys.stderr)
+        report["presets"][name] = bench_preset(name, seed, repeat, games, ai_options)
+    return report
+
+
+def compare(old, new):
+    """
+    Returns a table comparing median times of two reports.
+    """
+    lines = [f"{'preset':<14}{'benchmark':<20}{'old (ms)':>12}{'new (ms)':>12}{'speedup':>10}"]
+    for name, preset in new["presets"].items():
+        if name not in old["presets"]:
+            continue
+        old_bench = old["presets"][name]["benchmarks"]
+        for bench, stats in preset["benchmarks"].items():
+            if bench not in old_bench:
+                continue
+            before = old_bench[bench]["median"]
+            after = stats["median"]
+            if not after:
+                speedup = 1.0 if not before else float("inf")
+            else:
+                speedup = before / after
+            lines.append(
+                f"{name:<14}{bench:<20}{before * 1000:>12.3f}{after * 1000:>12.3f}{speedup:>9.2f}x"
+            )
+    return "\n".join(lines)
+
+
+def format_report(report):
+    lines = [f"{'preset':<14}{'benchmark':<20}{'median (ms)':>14}{'min (ms)':>12}{'runs':>7}"]
+    for name, preset in report["presets"].items():
+        for bench, stats in preset["benchmarks"].items():
+            lines.append(
+                f"{name:<14}{bench:<20}{stats['median'] * 1000:>14.3f}"
+                f"{stats['min'] * 1000:>12.3f}{stats['runs']:>7}"
+            )
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the Minesweeper engine and AI.")
+    parser.add_argument("-p", "--preset", action="append", choices=sorted(PRESETS),
+                        help="preset to run (repeatable, default: all)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-r", "--repeat", type=int, default=3)
+    parser.add_argument("-g", "--games", type=int, default=None,
+                        help="games per preset (default depends on board size)")
+    parser.add_argument("--bitsets", action="store_true",
+                        help="encode AI sentences as integer bitmasks")
+    parser.add_argument("--compact", action="store_true",
+                        help="keep AI cell state in flat arrays to save memory")
+    parser.add_argument("--guess", choices=GUESS_STRATEGIES, default="probability",
+                        help="how the AI guesses when no safe move is known")
+    parser.add_argument("-o", "--output", help="write the JSON report to this file")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"),
+                        help="compare two saved reports instead of running")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        with open(args.compare[0]) as f:
+            old = json.load(f)
+        with open(args.compare[1]) as f:
+            new = json.load(f)
+        print(compare(old, new))
+        return
+
+    ai_options = {"bitsets": args.bitsets, "guess": args.guess, "compact": args.compact}
+    report = run(args.preset or list(PRESETS), args.seed, args.repeat, args.games,
+                 ai_options)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    print(format_report(report))
+
+
+if __name__ == "__main__":
+    main()
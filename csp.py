@@ -1,218 +1,1400 @@
-import itertools
-import random
-
-class Sentence():
-    """
-    Ý nghĩa: Một “câu” mô tả: trong tập các ô cells, 
-    có đúng count ô là mìn. Ví dụ: {(1,1),(1,2),(2,1)} = 1
-    """
-
-    def __init__(self, cells, count):
-        self.cells = set(cells)# tập hợp các ô 
-        self.count = count# đến số ô mìn trong tập hợp cells
-
-    def __eq__(self, other):# so sánh xem 2 câu có trùng nhau không nếu đúng trả về True
-        return self.cells == other.cells and self.count == other.count
-
-    def __str__(self): # chuyển về chuỗi
-        return f"{self.cells} = {self.count}"
-
-    def known_mines(self): # xách định các ô chắc chắn là mìn 
-        if len(self.cells) == self.count:
-            return self.cells
-        return None
-
-    def known_safes(self): # xác định các ô chắc chắn an toàn 
-        if self.count == 0:
-            return self.cells
-        return None
-
-    def mark_mine(self, cell): # cập nhật lại câu nếu ô đó là mìn 
-        # xóa ô cell khỏi self.cells và giảm self.count đi 1 
-        newCells = set()
-        for item in self.cells:
-            if item != cell:
-                newCells.add(item)
-            else:
-                self.count -= 1
-        self.cells = newCells
-
-    def mark_safe(self, cell): # cập nhật lại câu nếu ô đó là an toàn 
-        #xóa ô cell khỏi self.cells và không giảm self.count 
-        newCells = set()
-        for item in self.cells:
-            if item != cell:
-                newCells.add(item)
-        self.cells = newCells
-        
-
-
-class MinesweeperAI():
-    """
-    Minesweeper game player
-    """
-
-    def __init__(self, height=8, width=8):
-
-        # Set initial height and width
-        self.height = height
-        self.width = width
-
-        # Keep track of which cells have been clicked on
-        self.moves_made = set() #các ô đã mở 
-
-        # Keep track of cells known to be safe or mines
-        self.mines = set() # các ô chắc chắn là mìn
-        self.safes = set()#các ô chắc chắn là an toàn
-
-        # List of sentences about the game known to be true
-        self.knowledge = []# danh sách các câu đã biết 
-
-    def mark_mine(self, cell):
-        """
-        Đánh dấu một ô là mìn và cập nhật tất cả câu
-        để đánh dấu ô đó cũng là mìn.
-        """
-        self.mines.add(cell)
-        for sentence in self.knowledge:
-            sentence.mark_mine(cell)
-
-    def mark_safe(self, cell):
-        """
-        Đánh dấu một ô là an toàn và cập nhật tất cả câu
-        để đánh dấu ô đó cũng an toàn.
-        """
-        self.safes.add(cell)
-        for sentence in self.knowledge:
-            sentence.mark_safe(cell)
-
-    def add_knowledge(self, cell, count):
-        # Mark cell as safe and add to moves_made
-        self.mark_safe(cell)
-        self.moves_made.add(cell)
-
-        # Create and Add sentence to knowledge
-        neighbors, count = self.get_cell_neighbors(cell, count)
-        """
-        lấy các ô lân cận chưa biết làm tập neighbors , điều chỉnh count 
-        trừ đi số ô lân cận đã biết là mìn(vì các ô mìn 
-        đã biết không nên nằm trong câu mới)
-        """
-        sentence = Sentence(neighbors, count)
-        self.knowledge.append(sentence)
-        new_inferences = []
-        #(3)Suy luận bằng quan hệ tập con/tập lớn
-        for s in self.knowledge: 
-            if s == sentence:
-                continue
-            elif s.cells.issuperset(sentence.cells):#Nếu s.cells bao sentence.cells (s là tập lớn, câu mới là tập con):
-                setDiff = s.cells-sentence.cells# phần chênh lệch giữa 2 tập hợp
-                # Known safes
-                if s.count == sentence.count: # -> phần chêcnh lệch không có mìn -> toàn bộ set diff là an toàn 
-                    for safeFound in setDiff:
-                        self.mark_safe(safeFound)
-                # Known mines
-                elif len(setDiff) == s.count - sentence.count: # ->phần chênh lệch là mìn -> toàn bộ set diff là mìn 
-                    for mineFound in setDiff:
-                        self.mark_mine(mineFound)
-                # Known inference
-                else: # nếu không có 2 cái kia thì suy ra câu mới 
-                    new_inferences.append(
-                        Sentence(setDiff, s.count - sentence.count)
-                    )
-            elif sentence.cells.issuperset(s.cells):#sentence.cells bao s.cells
-                setDiff = sentence.cells-s.cells
-                # Known safes
-                if s.count == sentence.count:
-                    for safeFound in setDiff:
-                        self.mark_safe(safeFound)
-                # Known mines
-                elif len(setDiff) == sentence.count - s.count:
-                    for mineFound in setDiff:
-                        self.mark_mine(mineFound)
-                # Known inference
-                else:
-                    new_inferences.append(
-                        Sentence(setDiff, sentence.count - s.count)
-                    )
-        """
-        (4) Làm sạch knowledge
-        """
-        self.knowledge.extend(new_inferences)
-        self.remove_dups() # loại bỏ các câu trùng lặp
-        self.remove_sures()#để gặt hái kết quả chắc chắn
-
-    def make_safe_move(self):
-        """
-        trả về một ô an toàn để chọn trên bảng Dò mìn.
-        Nước đi phải được xác định là an toàn, và chưa phải là nước đi
-        đã được thực hiện.
-        Hàm này có thể sử dụng kiến thức trong self.mines, self.safes
-        và self.moves_made, nhưng không được sửa đổi bất kỳ giá trị nào trong số đó.
-        """
-        safeCells = self.safes - self.moves_made
-        if not safeCells:
-            return None
-        # print(f"Pool: {safeCells}")
-        move = safeCells.pop()
-        return move
-
-    def make_random_move(self):
-        """
-        Trả về một nước đi cần thực hiện trên bảng Dò mìn.
-        Nên chọn ngẫu nhiên trong số các ô:
-        1) chưa được chọn, và
-        2) không được biết là có mìn
-        """
-        all_moves = set()
-        for i in range(self.height):
-            for j in range(self.width):
-                if (i,j) not in self.mines and (i,j) not in self.moves_made:
-                    all_moves.add((i,j))
-        # No moves left
-        if len(all_moves) == 0:
-            return None
-        # Return available
-        move = random.choice(tuple(all_moves))
-        return move
-               
-    def get_cell_neighbors(self, cell, count):
-        #Tìm ra danh sách hàng xóm chưa biết quanh ô đó.
-        #Điều chỉnh lại số mìn count nếu trong các hàng xóm đã có ô nào chắc chắn là mìn.
-        i, j = cell
-        neighbors = []
-        # quét hình vuông 3x3 quanh cell 
-        for row in range(i-1, i+2):
-            for col in range(j-1, j+2):
-                if (row >= 0 and row < self.height) \
-                and (col >= 0 and col < self.width) \
-                and (row, col) != cell \
-                and (row, col) not in self.safes \
-                and (row, col) not in self.mines:
-                #lọc ô trong bàn và chưa nằm trong an toàn hoặc mìn
-                    neighbors.append((row, col))
-                if (row, col) in self.mines: # nếu ô nằm trong mines thì giảm count đi 1
-                    count -= 1
-
-        return neighbors, count
-
-    def remove_dups(self):
-        unique_knowledge = []
-        for s in self.knowledge:
-            if s not in unique_knowledge:
-                unique_knowledge.append(s)
-        self.knowledge = unique_knowledge
-
-    def remove_sures(self):
-        final_knowledge = []
-        for s in self.knowledge:
-            final_knowledge.append(s)
-            if s.known_mines():  # nếu có ô mìn chắc chắn
-                for mineFound in s.known_mines():
-                    self.mark_mine(mineFound) # thêm vào mìn
-                final_knowledge.pop(-1)#loại bỏ câu đó
-            elif s.known_safes():# nếu có ô an toàn chắc chắn
-                for safeFound in s.known_safes():
-                    self.mark_safe(safeFound)# thêm vào ô an toàn 
-                final_knowledge.pop(-1)#loại bỏ câu đó
-        self.knowledge = final_knowledge
+import itertools
+import math
+import random
+from array import array
+from collections import OrderedDict, deque
+from collections.abc import MutableSet
+
+# Components with more cell classes than this are not enumerated exactly
+# (the search would also get close to Python's recursion limit)
+MAX_EXACT_CLASSES = 400
+
+GUESS_STRATEGIES = ("probability", "random")
+
+# Probabilities closer than this are treated as a tie when guessing
+GUESS_TIE = 1e-9
+
+class Sentence():
+    """
+    Ý nghĩa: Một “câu” mô tả: trong tập các ô cells, 
+    có đúng count ô là mìn. Ví dụ: {(1,1),(1,2),(2,1)} = 1
+    """
+
+    __slots__ = ("cells", "count")
+
+    def __init__(self, cells, count):
+        self.cells = set(cells)# tập hợp các ô 
+        self.count = count# đến số ô mìn trong tập hợp cells
+
+    def __eq__(self, other):# so sánh xem 2 câu có trùng nhau không nếu đúng trả về True
+        return self.cells == other.cells and self.count == other.count
+
+    def __hash__(self):
+        # Hash theo nội dung: thay đổi khi câu bị cập nhật, vì vậy
+        # phải lấy câu ra khỏi dict/set trước khi gọi mark_mine/mark_safe
+        return hash(self.key())
+
+    def key(self):
+        """
+        Canonical hashable form of the sentence: (frozenset(cells), count).
+        Two sentences are equal exactly when their keys are equal.
+        """
+        return (frozenset(self.cells), self.count)
+
+    def size(self): # số ô trong câu
+        return len(self.cells)
+
+    def issuperset(self, other): # câu này có bao câu other không
+        return self.cells.issuperset(other.cells)
+
+    def difference(self, other):
+        """
+        Sentence for the cells of self that are not in other, assuming
+        self is a superset of other: it holds self.count - other.count mines.
+        """
+        return Sentence(self.cells - other.cells, self.count - other.count)
+
+    def __str__(self): # chuyển về chuỗi
+        return f"{self.cells} = {self.count}"
+
+    def known_mines(self): # xách định các ô chắc chắn là mìn 
+        if len(self.cells) == self.count:
+            return self.cells
+        return None
+
+    def known_safes(self): # xác định các ô chắc chắn an toàn 
+        if self.count == 0:
+            return self.cells
+        return None
+
+    def mark_mine(self, cell): # cập nhật lại câu nếu ô đó là mìn 
+        # xóa ô cell khỏi self.cells và giảm self.count đi 1 
+        if cell in self.cells:
+            self.cells.remove(cell)
+            self.count -= 1
+
+    def mark_safe(self, cell): # cập nhật lại câu nếu ô đó là an toàn 
+        #xóa ô cell khỏi self.cells và không giảm self.count 
+        self.cells.discard(cell)
+        
+
+
+class BitSentence():
+    """
+    Sentence with its cells encoded as an integer bitmask over the flat
+    board index i * width + j. The mask is stored relative to `base`,
+    the index of the lowest cell, so a sentence only spans about two
+    board rows of bits wherever it is on the board. Superset tests,
+    differences and cell counts are integer operations. `cells` holds
+    the same cells as (row, col) tuples for the public API and the cell
+    index; it is decoded once per sentence and updated in place by
+    mark_mine/mark_safe, like Sentence.cells.
+    """
+
+    __slots__ = ("width", "count", "base", "mask", "cells")
+
+    def __init__(self, cells, count, width):
+        self.width = width
+        self.count = count
+        self.cells = set(cells)
+        # Lấy base trước để mask chỉ rộng bằng khoảng cách giữa các ô,
+        # không phải cả bàn cờ
+        indexes = [i * width + j for i, j in self.cells]
+        base = min(indexes) if indexes else 0
+        mask = 0
+        for index in indexes:
+            mask |= 1 << (index - base)
+        self.base = base
+        self.mask = mask
+
+    @classmethod
+    def from_mask(cls, base, mask, count, width):
+        sentence = cls.__new__(cls)
+        sentence.width = width
+        sentence.count = count
+        sentence.base = base
+        sentence.mask = mask
+        sentence.normalize()
+        # Giải mã mask thành các ô (row, col) một lần cho cả đời câu
+        cells = set()
+        base = sentence.base
+        mask = sentence.mask
+        while mask:
+            low = mask & -mask
+            cells.add(divmod(base + low.bit_length() - 1, width))
+            mask ^= low
+        sentence.cells = cells
+        return sentence
+
+    def normalize(self):
+        # Dịch mask để bit thấp nhất luôn là ô có chỉ số base,
+        # giúp mỗi câu có đúng một biểu diễn
+        if self.mask == 0:
+            self.base = 0
+            return
+        shift = (self.mask & -self.mask).bit_length() - 1
+        if shift:
+            self.mask >>= shift
+            self.base += shift
+
+    def __eq__(self, other):
+        return (self.mask == other.mask and self.base == other.base
+                and self.count == other.count)
+
+    def __hash__(self):
+        return hash(self.key())
+
+    def __str__(self):
+        return f"{self.cells} = {self.count}"
+
+    def key(self):
+        return (self.base, self.mask, self.count)
+
+    def size(self):
+        return self.mask.bit_count()
+
+    def issuperset(self, other):
+        if other.mask == 0:
+            return True
+        offset = other.base - self.base
+        if offset < 0:
+            return False
+        return (other.mask << offset) & ~self.mask == 0
+
+    def difference(self, other):
+        offset = other.base - self.base
+        mask = self.mask & ~(other.mask << offset) if offset >= 0 else self.mask
+        return BitSentence.from_mask(self.base, mask, self.count - other.count, self.width)
+
+    def known_mines(self):
+        if self.mask.bit_count() == self.count:
+            return self.cells
+        return None
+
+    def known_safes(self):
+        if self.count == 0:
+            return self.cells
+        return None
+
+    def mark_mine(self, cell):
+        i, j = cell
+        bit = i * self.width + j - self.base
+        if bit >= 0 and self.mask >> bit & 1:
+            self.mask ^= 1 << bit
+            self.count -= 1
+            self.cells.discard(cell)
+            # Chỉ khi bỏ ô thấp nhất thì base mới đổi
+            if bit == 0:
+                self.normalize()
+
+    def mark_safe(self, cell):
+        i, j = cell
+        bit = i * self.width + j - self.base
+        if bit >= 0 and self.mask >> bit & 1:
+            self.mask ^= 1 << bit
+            self.cells.discard(cell)
+            if bit == 0:
+                self.normalize()
+
+
+class BinomialTable():
+    """
+    Memoized exact binomial coefficients C(n, k).
+
+    A missing entry next to a cached one in the same row is derived with
+    one multiplication and one exact division, so the run of C(U, R - t)
+    values needed to weigh a frontier costs one math.comb call per row.
+    Only the max_rows most recently used rows are kept.
+    """
+
+    def __init__(self, max_rows=64):
+        self.max_rows = max_rows
+        self.rows = OrderedDict()
+
+    def __call__(self, n, k):
+        if k < 0 or k > n:
+            return 0
+        row = self.rows.get(n)
+        if row is None:
+            row = self.rows[n] = {}
+            if len(self.rows) > self.max_rows:
+                self.rows.popitem(last=False)
+        else:
+            self.rows.move_to_end(n)
+        value = row.get(k)
+        if value is None:
+            if k - 1 in row:
+                value = row[k - 1] * (n - k + 1) // k
+            elif k + 1 in row:
+                value = row[k + 1] * (k + 1) // (n - k)
+            else:
+                value = math.comb(n, k)
+            row[k] = value
+        return value
+
+
+binomial = BinomialTable()
+
+
+def convolve(a, b):
+    """
+    Product of two weight lists indexed by mine count.
+    """
+    result = [0] * (len(a) + len(b) - 1)
+    for i, x in enumerate(a):
+        if x:
+            for j, y in enumerate(b):
+                if y:
+                    result[i + j] += x * y
+    return result
+
+
+def deconvolve(full, factor):
+    """
+    Exact quotient full / factor of weight lists, where full is known to
+    be factor times some other list. Cheaper than re-convolving all the
+    other factors.
+    """
+    lo = 0
+    while not factor[lo]:
+        lo += 1
+    factor = factor[lo:]
+    full = full[lo:]
+    result = [0] * (len(full) - len(factor) + 1)
+    for i in range(len(result)):
+        value = full[i]
+        for m in range(1, min(i, len(factor) - 1) + 1):
+            value -= factor[m] * result[i - m]
+        result[i] = value // factor[0]
+    return result
+
+
+def weigh_components(solutions, unconstrained, remaining):
+    """
+    Combines independent component solutions under the global mine count.
+
+    A frontier assignment with t mines in total leaves remaining - t
+    mines for the unconstrained cells, which can be placed in
+    C(unconstrained, remaining - t) ways. Returns (probabilities,
+    interior): exact per-cell probabilities for the frontier and the
+    probability for each unconstrained cell, or (None, None) if no
+    assignment is consistent with the mine count.
+    """
+    dists = []
+    for solution in solutions:
+        dist = [0] * (max(solution.weights) + 1)
+        for k, weight in solution.weights.items():
+            dist[k] = weight
+        dists.append(dist)
+    full = [1]
+    for dist in dists:
+        full = convolve(full, dist)
+
+    def ways(t):
+        return binomial(unconstrained, remaining - t)
+
+    total = sum(weight * ways(t) for t, weight in enumerate(full) if weight)
+    if not total:
+        return None, None
+
+    probabilities = {}
+    for solution, dist in zip(solutions, dists):
+        rest = deconvolve(full, dist)
+        # factor[k]: weight of everything outside this component given k mines in it
+        factor = {
+            k: sum(w * ways(k + r) for r, w in enumerate(rest) if w)
+            for k in solution.weights
+        }
+        for i, cells in enumerate(solution.classes):
+            mines = sum(acc[i] * factor[k] for k, acc in solution.class_mines.items())
+            p = mines / (total * len(cells))
+            for cell in cells:
+                probabilities[cell] = p
+
+    interior = None
+    if unconstrained:
+        expected = sum(
+            weight * ways(t) * (remaining - t) for t, weight in enumerate(full) if weight
+        )
+        interior = expected / (total * unconstrained)
+    return probabilities, interior
+
+
+class ComponentSolution():
+    """
+    Kết quả giải chính xác một thành phần liên thông của biên.
+
+    Cells that belong to exactly the same sentences are interchangeable,
+    so they are grouped into classes and the search assigns a number of
+    mines to each class. For every total number of mines k in the
+    component, weights[k] is the number of consistent cell assignments
+    and class_mines[k][i] is the sum, over those assignments, of the
+    mines placed in class i.
+    """
+
+    __slots__ = ("classes", "weights", "class_mines")
+
+    def __init__(self, classes):
+        self.classes = classes
+        self.weights = {}
+        self.class_mines = {}
+
+    def record(self, k, weight, counts):
+        if k not in self.weights:
+            self.weights[k] = 0
+            self.class_mines[k] = [0] * len(self.classes)
+        self.weights[k] += weight
+        acc = self.class_mines[k]
+        for i, x in enumerate(counts):
+            if x:
+                acc[i] += weight * x
+
+    def probabilities(self):
+        """
+        Returns {cell: probability of being a mine}, counting every
+        consistent assignment of the component as equally likely.
+        """
+        total = sum(self.weights.values())
+        probabilities = {}
+        if not total:
+            return probabilities
+        for i, cells in enumerate(self.classes):
+            mines = sum(acc[i] for acc in self.class_mines.values())
+            p = mines / (total * len(cells))
+            for cell in cells:
+                probabilities[cell] = p
+        return probabilities
+
+
+class ComponentCache():
+    """
+    Bounded LRU cache of ComponentSolution objects.
+
+    Entries are keyed by the component's constraint set (the keys of
+    its sentences), so a component that did not change between two
+    moves is not solved again. Each entry is also indexed by its cells:
+    invalidate(cells) drops every entry touching those cells as soon as
+    a reveal or a mark makes it stale, instead of leaving it to age out.
+    """
+
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.cell_keys = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def key(component):
+        return frozenset(sentence.key() for sentence in component)
+
+    def get(self, key):
+        """
+        Returns (True, solution) on a hit and (False, None) on a miss;
+        a cached solution may itself be None for a component that was
+        too large to solve.
+        """
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return False, None
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return True, entry[0]
+
+    def put(self, key, solution, cells):
+        if self.maxsize <= 0:
+            return
+        self.entries[key] = (solution, cells)
+        for cell in cells:
+            self.cell_keys.setdefault(cell, set()).add(key)
+        while len(self.entries) > self.maxsize:
+            old_key, _ = next(iter(self.entries.items()))
+            self.drop(old_key)
+            self.evictions += 1
+
+    def drop(self, key):
+        _, cells = self.entries.pop(key)
+        for cell in cells:
+            keys = self.cell_keys.get(cell)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self.cell_keys[cell]
+
+    def invalidate(self, cells):
+        if not self.cell_keys:
+            return
+        for cell in cells:
+            for key in list(self.cell_keys.get(cell, ())):
+                self.drop(key)
+                self.invalidations += 1
+
+    def stats(self):
+        return {
+            "size": len(self.entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+
+class CellPool():
+    """
+    Set of cells with O(1) add, discard, membership and indexed access.
+    Cells live in a list with a cell -> position map; discard moves the
+    last cell into the freed slot, so the order is deterministic for a
+    given sequence of updates and rng.choice over it stays reproducible.
+    members is the fastest object to test membership against.
+    """
+
+    __slots__ = ("items", "positions", "members")
+
+    def __init__(self, cells=()):
+        self.items = list(cells)
+        self.positions = {cell: i for i, cell in enumerate(self.items)}
+        self.members = self.positions
+
+    def __len__(self):
+        return len(self.items)
+
+    def __contains__(self, cell):
+        return cell in self.positions
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __getitem__(self, k):
+        return self.items[k]
+
+    def add(self, cell):
+        if cell not in self.positions:
+            self.positions[cell] = len(self.items)
+            self.items.append(cell)
+
+    def discard(self, cell):
+        i = self.positions.pop(cell, None)
+        if i is None:
+            return
+        last = self.items.pop()
+        if i < len(self.items):
+            self.items[i] = last
+            self.positions[last] = i
+
+
+class FlatCellPool():
+    """
+    CellPool for compact mode. Cells are stored as flat indices
+    i * width + j in an array('i'), and the position map is a second
+    array with one slot per board cell (-1 when absent) instead of a
+    dict of tuples. Cells still go in and come out as (row, col).
+    """
+
+    __slots__ = ("height", "width", "items", "positions", "members")
+
+    def __init__(self, height, width, full=False):
+        self.height = height
+        self.width = width
+        if full:
+            self.items = array("i", range(height * width))
+            self.positions = array("i", range(height * width))
+        else:
+            self.items = array("i")
+            self.positions = array("i", [-1]) * (height * width)
+        self.members = self
+
+    def __len__(self):
+        return len(self.items)
+
+    def __contains__(self, cell):
+        i, j = cell
+        return (0 <= i < self.height and 0 <= j < self.width
+                and self.positions[i * self.width + j] >= 0)
+
+    def __iter__(self):
+        width = self.width
+        for index in self.items:
+            yield divmod(index, width)
+
+    def __getitem__(self, k):
+        return divmod(self.items[k], self.width)
+
+    def add(self, cell):
+        index = cell[0] * self.width + cell[1]
+        if self.positions[index] < 0:
+            self.positions[index] = len(self.items)
+            self.items.append(index)
+
+    def discard(self, cell):
+        index = cell[0] * self.width + cell[1]
+        i = self.positions[index]
+        if i < 0:
+            return
+        self.positions[index] = -1
+        last = self.items.pop()
+        if i < len(self.items):
+            self.items[i] = last
+            self.positions[last] = i
+
+
+class CellBitmap(MutableSet):
+    """
+    Set of (row, col) cells stored as one byte per board cell in a
+    bytearray indexed by i * width + j. Used for moves_made, safes and
+    mines in compact mode instead of sets of tuples.
+    """
+
+    __slots__ = ("height", "width", "bits", "size")
+
+    def __init__(self, height, width):
+        self.height = height
+        self.width = width
+        self.bits = bytearray(height * width)
+        self.size = 0
+
+    def __contains__(self, cell):
+        i, j = cell
+        return 0 <= i < self.height and 0 <= j < self.width and self.bits[i * self.width + j] == 1
+
+    def __iter__(self):
+        # bytearray.find quét trong C, bỏ qua nhanh các ô trống
+        find = self.bits.find
+        width = self.width
+        index = find(1)
+        while index != -1:
+            yield divmod(index, width)
+            index = find(1, index + 1)
+
+    def __len__(self):
+        return self.size
+
+    def add(self, cell):
+        index = cell[0] * self.width + cell[1]
+        if not self.bits[index]:
+            self.bits[index] = 1
+            self.size += 1
+
+    def discard(self, cell):
+        if cell in self:
+            self.bits[cell[0] * self.width + cell[1]] = 0
+            self.size -= 1
+
+    def clear(self):
+        self.bits = bytearray(self.height * self.width)
+        self.size = 0
+
+    def copy(self):
+        return set(self)
+
+
+class UnknownCells():
+    """
+    Unknown-cell view for sparse mode, where the board is too large (or
+    unbounded) to list its cells. Size and membership are derived from
+    safes and mines, and sample() draws a uniformly random unknown cell
+    by rejection, which is fast while the known cells are a small part
+    of the board. It cannot be iterated or indexed.
+    """
+
+    __slots__ = ("height", "width", "safes", "mines", "members")
+
+    def __init__(self, height, width, safes, mines):
+        self.height = height
+        self.width = width
+        self.safes = safes
+        self.mines = mines
+        self.members = self
+
+    def __len__(self):
+        return self.height * self.width - len(self.safes) - len(self.mines)
+
+    def __contains__(self, cell):
+        i, j = cell
+        return (0 <= i < self.height and 0 <= j < self.width
+                and cell not in self.safes and cell not in self.mines)
+
+    def add(self, cell):
+        pass
+
+    def discard(self, cell):
+        pass
+
+    def sample(self, rng, exclude=()):
+        """
+        Returns a random unknown cell not in exclude, or None if there
+        is none left to draw.
+        """
+        # exclude có thể chứa cả mìn và ô an toàn đã biết: chỉ đếm ô chưa biết
+        if len(self) <= sum(1 for cell in exclude if cell in self):
+            return None
+        while True:
+            cell = (rng.randrange(self.height), rng.randrange(self.width))
+            if cell in self and cell not in exclude:
+                return cell
+
+
+def frontier_components(sentences):
+    """
+    Splits sentences into independent groups: two sentences are in the
+    same group when they share a cell, directly or through other
+    sentences. Returns a list of lists of sentences.
+    """
+    parent = {}
+
+    def find(cell):
+        while parent[cell] != cell:
+            parent[cell] = parent[parent[cell]]
+            cell = parent[cell]
+        return cell
+
+    decoded = []
+    for sentence in sentences:
+        cells = list(sentence.cells)
+        if not cells:
+            continue
+        decoded.append((sentence, cells[0]))
+        for cell in cells:
+            parent.setdefault(cell, cell)
+        root = find(cells[0])
+        for cell in cells[1:]:
+            other = find(cell)
+            if other != root:
+                parent[other] = root
+
+    groups = {}
+    for sentence, cell in decoded:
+        groups.setdefault(find(cell), []).append(sentence)
+    return list(groups.values())
+
+
+def solve_component(sentences, max_classes=MAX_EXACT_CLASSES):
+    """
+    Counts every mine assignment of a connected group of sentences that
+    satisfies all of them, by backtracking over cell classes with
+    forced-move propagation. Returns a ComponentSolution, or None if the
+    component has more than max_classes classes.
+    """
+    constraints = [(list(s.cells), s.count) for s in sentences]
+
+    # Gom các ô thuộc cùng một tập câu thành một lớp
+    membership = {}
+    for c, (cells, _) in enumerate(constraints):
+        for cell in cells:
+            membership.setdefault(cell, []).append(c)
+    grouped = {}
+    for cell, cons in membership.items():
+        grouped.setdefault(tuple(cons), []).append(cell)
+    if len(grouped) > max_classes:
+        return None
+
+    # Order classes breadth-first through the constraints, so each
+    # assignment quickly completes a constraint and prunes early
+    con_classes = [[] for _ in constraints]
+    for cons, cells in grouped.items():
+        for c in cons:
+            con_classes[c].append(cons)
+    order = []
+    seen_classes = set()
+    seen_cons = {0}
+    queue = deque([0])
+    while queue:
+        c = queue.popleft()
+        for cons in con_classes[c]:
+            if cons not in seen_classes:
+                seen_classes.add(cons)
+                order.append(cons)
+                for other in cons:
+                    if other not in seen_cons:
+                        seen_cons.add(other)
+                        queue.append(other)
+
+    classes = [grouped[cons] for cons in order]
+    sizes = [len(cells) for cells in classes]
+    class_cons = [list(cons) for cons in order]
+    index = {cons: i for i, cons in enumerate(order)}
+    members = [[index[cons] for cons in con_classes[c]] for c in range(len(constraints))]
+
+    # need[c]: mines still to place in constraint c; left[c]: unassigned cells in it
+    need = [count for _, count in constraints]
+    left = [len(cells) for cells, _ in constraints]
+    value = [None] * len(classes)
+    trail = []
+    solution = ComponentSolution(classes)
+
+    def assign(i, x):
+        value[i] = x
+        trail.append(i)
+        ok = True
+        for c in class_cons[i]:
+            left[c] -= sizes[i]
+            need[c] -= x
+            if need[c] < 0 or need[c] > left[c]:
+                ok = False
+        return ok
+
+    def undo(mark):
+        while len(trail) > mark:
+            i = trail.pop()
+            for c in class_cons[i]:
+                left[c] += sizes[i]
+                need[c] += value[i]
+            value[i] = None
+
+    def force(touched):
+        # Một câu không còn lựa chọn: hoặc đã đủ mìn, hoặc mọi ô còn lại là mìn
+        stack = list(touched)
+        while stack:
+            c = stack.pop()
+            if left[c] == 0:
+                continue
+            if need[c] == 0:
+                full = False
+            elif need[c] == left[c]:
+                full = True
+            else:
+                continue
+            for i in members[c]:
+                if value[i] is None:
+                    if not assign(i, sizes[i] if full else 0):
+                        return False
+                    stack.extend(class_cons[i])
+        return True
+
+    def search(pos):
+        while pos < len(classes) and value[pos] is not None:
+            pos += 1
+        if pos == len(classes):
+            weight = 1
+            for i, x in enumerate(value):
+                if 0 < x < sizes[i]:
+                    weight *= math.comb(sizes[i], x)
+            solution.record(sum(value), weight, value)
+            return
+        for x in range(sizes[pos] + 1):
+            mark = len(trail)
+            if assign(pos, x) and force(class_cons[pos]):
+                search(pos + 1)
+            undo(mark)
+
+    mark = len(trail)
+    if force(range(len(constraints))):
+        search(0)
+    undo(mark)
+    return solution
+
+
+class MinesweeperAI():
+    """
+    Minesweeper game player
+    """
+
+    def __init__(self, height=8, width=8, rng=None, bitsets=False, total_mines=None,
+                 guess="probability", cache_size=1024, patterns=None, compact=False,
+                 sparse=False):
+
+        # Set initial height and width
+        self.height = height
+        self.width = width
+
+        # Total number of mines on the board, if known; lets
+        # mine_probabilities use the remaining-mine count
+        self.total_mines = total_mines
+
+        # Compact mode keeps the per-cell state in flat arrays (one byte
+        # or one int per board cell) instead of sets and dicts of tuples,
+        # and always uses BitSentence; the set-like attributes below keep
+        # their (row, col) interface either way
+        self.compact = compact
+
+        # Store sentences as BitSentence bitmasks instead of sets of tuples
+        self.bitsets = bitsets or compact
+
+        # Sparse mode never lists the cells of the board, so every
+        # structure grows with the explored area only; for huge or
+        # unbounded boards such as game.ChunkedMinesweeper
+        if sparse and self.bitsets:
+            raise ValueError("sparse mode keeps cells as tuples; it cannot be combined with bitsets or compact")
+        self.sparse = sparse
+
+        # Guessing strategy used when no safe move is known:
+        # "probability" picks the lowest-risk cell, "random" any unknown cell
+        if guess not in GUESS_STRATEGIES:
+            raise ValueError(f"unknown guess strategy {guess!r}, expected one of {GUESS_STRATEGIES}")
+        self.guess = guess
+
+        # Random source for random moves; pass a seeded random.Random
+        # to make the game reproducible
+        self.rng = rng if rng is not None else random
+
+        # Keep track of which cells have been clicked on
+        self.moves_made = self.new_cell_set() #các ô đã mở 
+
+        # Keep track of cells known to be safe or mines
+        self.mines = self.new_cell_set() # các ô chắc chắn là mìn
+        self.safes = self.new_cell_set()#các ô chắc chắn là an toàn
+
+        # Maintained by mark_mine/mark_safe/add_knowledge so that picking
+        # a move never scans the board: cells not yet known to be safe or
+        # mines, and known safe cells that have not been played yet
+        if sparse:
+            self.unknown = UnknownCells(height, width, self.safes, self.mines)
+        elif compact:
+            self.unknown = FlatCellPool(height, width, full=True)
+        else:
+            self.unknown = CellPool((i, j) for i in range(height) for j in range(width))
+        self.safe_moves = self.new_cell_pool()
+
+        # Sentences about the game known to be true, keyed by
+        # Sentence.key() so a duplicate is rejected when it is inserted
+        self.knowledge = {}# các câu đã biết, không trùng lặp 
+
+        # Inverted index: cell -> {id(sentence): sentence} for every
+        # sentence in knowledge that still contains the cell
+        self.cell_index = {}
+
+        # Sentences added or changed since propagate() last ran
+        self.pending = deque()
+
+        # Solved frontier components, reused while they do not change
+        self.component_cache = ComponentCache(cache_size)
+
+        # Sentences compared by propagate(), for stats.SolverStats
+        self.subset_checks = 0
+
+        # Optional patterns.PatternTable of local 5x5 deductions, and the
+        # number shown by each revealed cell, used to build its windows
+        # (only recorded when a table is set)
+        self.patterns = patterns
+        self.numbers = {}
+
+    def new_cell_set(self):
+        if self.compact:
+            return CellBitmap(self.height, self.width)
+        return set()
+
+    def new_cell_pool(self):
+        if self.compact:
+            return FlatCellPool(self.height, self.width)
+        return CellPool()
+
+    def mark_mine(self, cell):
+        """
+        Đánh dấu một ô là mìn và cập nhật tất cả câu
+        để đánh dấu ô đó cũng là mìn.
+        """
+        self.mines.add(cell)
+        self.unknown.discard(cell)
+        self.component_cache.invalidate((cell,))
+        # Chỉ các câu chứa ô này mới thay đổi
+        for sentence in self.cell_index.pop(cell, {}).values():
+            del self.knowledge[sentence.key()]
+            sentence.mark_mine(cell)
+            self.rekey_sentence(sentence)
+
+    def mark_safe(self, cell):
+        """
+        Đánh dấu một ô là an toàn và cập nhật tất cả câu
+        để đánh dấu ô đó cũng an toàn.
+        """
+        self.safes.add(cell)
+        self.unknown.discard(cell)
+        if cell not in self.moves_made:
+            self.safe_moves.add(cell)
+        self.component_cache.invalidate((cell,))
+        for sentence in self.cell_index.pop(cell, {}).values():
+            del self.knowledge[sentence.key()]
+            sentence.mark_safe(cell)
+            self.rekey_sentence(sentence)
+
+    def new_sentence(self, cells, count):
+        """
+        Creates a sentence in the encoding chosen for this AI.
+        """
+        if self.bitsets:
+            return BitSentence(cells, count, self.width)
+        return Sentence(cells, count)
+
+    def add_sentence(self, sentence):
+        """
+        Adds a sentence to knowledge and indexes it by its cells.
+        Returns False, without adding it, if an equal sentence is
+        already known.
+        """
+        key = sentence.key()
+        if key in self.knowledge:
+            return False
+        self.knowledge[key] = sentence
+        for cell in sentence.cells:
+            self.cell_index.setdefault(cell, {})[id(sentence)] = sentence
+        self.pending.append(sentence)
+        return True
+
+    def rekey_sentence(self, sentence):
+        """
+        Puts back a sentence that was taken out of knowledge to be
+        updated. If the update made it equal to a known sentence,
+        it is dropped from the index instead.
+        """
+        key = sentence.key()
+        if key in self.knowledge:
+            self.unindex_sentence(sentence)
+        else:
+            self.knowledge[key] = sentence
+            self.pending.append(sentence)
+
+    def discard_sentence(self, sentence):
+        """
+        Removes a sentence from knowledge and from the index.
+        """
+        key = sentence.key()
+        if self.knowledge.get(key) is sentence:
+            del self.knowledge[key]
+            self.unindex_sentence(sentence)
+
+    def unindex_sentence(self, sentence):
+        """
+        Removes a sentence that is leaving knowledge from the index.
+        """
+        for cell in sentence.cells:
+            entries = self.cell_index.get(cell)
+            if entries is not None:
+                entries.pop(id(sentence), None)
+                if not entries:
+                    del self.cell_index[cell]
+
+    def add_knowledge(self, cell, count):
+        """
+        Records that cell was revealed showing count adjacent mines and
+        draws every conclusion that follows from it.
+        """
+        self.observe(cell, count)
+        self.propagate()
+
+    def add_knowledge_bulk(self, region):
+        """
+        Records a whole region of (cell, count) reveals, such as the
+        cells opened by one flood fill or a batch of safe moves, and runs
+        inference once for the region.
+        Every cell of the region is marked safe before any sentence is
+        built, so sentences only mention cells outside the region. The
+        interior of a blank region then has no unknown neighbours and
+        produces no sentence at all; only its boundary does.
+        region may be any iterable; it is read twice, so it is copied.
+        """
+        region = list(region)
+        for cell, count in region:
+            self.record_reveal(cell, count)
+        for cell, count in region:
+            self.add_cell_sentence(cell, count)
+        self.propagate()
+
+    def observe(self, cell, count):
+        """
+        Records a revealed cell and queues its sentence; propagate()
+        draws the conclusions.
+        """
+        self.record_reveal(cell, count)
+        self.add_cell_sentence(cell, count)
+
+    def record_reveal(self, cell, count):
+        # Mark cell as safe and add to moves_made
+        self.moves_made.add(cell)
+        self.mark_safe(cell)
+        self.safe_moves.discard(cell)
+        if self.patterns is not None:
+            self.numbers[cell] = count
+
+    def add_cell_sentence(self, cell, count):
+        """
+        Adds the sentence given by the number of a revealed cell over its
+        neighbours that are still unknown. Nothing is added when every
+        neighbour is already known.
+        """
+        # Create and Add sentence to knowledge
+        neighbors, adjusted = self.get_cell_neighbors(cell, count)
+        if not neighbors:
+            return
+        # Bảng chỉ có ích khi câu mới chồng lên một câu đã có và chưa
+        # tự quyết định (toàn an toàn/toàn mìn)
+        if (
+            self.patterns is not None and 0 < adjusted < len(neighbors)
+            and any(neighbor in self.cell_index for neighbor in neighbors)
+        ):
+            if self.apply_patterns(cell):
+                neighbors, adjusted = self.get_cell_neighbors(cell, count)
+                if not neighbors:
+                    return
+        """
+        lấy các ô lân cận chưa biết làm tập neighbors , điều chỉnh count 
+        trừ đi số ô lân cận đã biết là mìn(vì các ô mìn 
+        đã biết không nên nằm trong câu mới)
+        """
+        sentence = self.new_sentence(neighbors, adjusted)
+        self.component_cache.invalidate(neighbors)
+        # Câu toàn an toàn/toàn mìn được đánh dấu ngay thay vì xếp hàng,
+        # để các ô kế tiếp trong cùng một lô có câu nhỏ hơn
+        self.add_inference(sentence)
+
+    def apply_patterns(self, cell):
+        """
+        Marks the cells that the pattern table deduces from the window
+        around a newly revealed cell. add_knowledge calls this before
+        building the cell's sentence, so when the window decides every
+        neighbour the sentence is empty and no subset inference runs for it.
+        Returns whether any cell was marked.
+        """
+        safes, mines = self.patterns.deduce(self, cell)
+        marked = False
+        for found in mines:
+            if found not in self.mines:
+                self.mark_mine(found)
+                marked = True
+        for found in safes:
+            if found not in self.safes:
+                self.mark_safe(found)
+                marked = True
+        return marked
+
+    def is_known(self, sentence):
+        # Câu vẫn còn trong knowledge với nội dung hiện tại
+        return self.knowledge.get(sentence.key()) is sentence
+
+    def add_inference(self, sentence):
+        """
+        Applies a derived sentence: marks its cells if it is trivial,
+        otherwise adds it to knowledge (which queues it).
+        """
+        if sentence.count == 0:
+            for safeFound in sentence.cells:
+                self.mark_safe(safeFound)
+        elif sentence.size() == sentence.count:
+            for mineFound in sentence.cells:
+                self.mark_mine(mineFound)
+        else:
+            self.add_sentence(sentence)
+
+    def propagate(self):
+        """
+        Runs inference to a fixpoint over the queue of sentences that
+        were added or changed. A queued sentence that is all mines or
+        all safes is resolved and removed; otherwise it is compared
+        only with the sentences sharing a cell with it (found through
+        cell_index), since only those can be its subset or superset.
+        Every mark re-queues the sentences it changes, so deductions
+        that become possible later in the same pass are not missed.
+        """
+        pending = self.pending
+        while pending:
+            sentence = pending.popleft()
+            if not self.is_known(sentence):
+                continue # câu đã bị loại hoặc đã thay đổi (được xếp hàng lại)
+
+            mines = sentence.known_mines()
+            if mines:
+                self.discard_sentence(sentence)
+                for mineFound in list(mines):
+                    self.mark_mine(mineFound)
+                continue
+            safes = sentence.known_safes()
+            if safes is not None or sentence.size() == 0:
+                self.discard_sentence(sentence)
+                for safeFound in list(safes or ()):
+                    self.mark_safe(safeFound)
+                continue
+
+            #(3)Suy luận bằng quan hệ tập con/tập lớn với các câu có chung ô
+            neighbours = {}
+            for cell in sentence.cells:
+                neighbours.update(self.cell_index.get(cell, {}))
+            self.subset_checks += len(neighbours) - 1
+            for s in neighbours.values():
+                if s is sentence or not self.is_known(s):
+                    continue
+                if s.issuperset(sentence):
+                    self.add_inference(s.difference(sentence))
+                elif sentence.issuperset(s):
+                    self.add_inference(sentence.difference(s))
+                else:
+                    continue
+                if not self.is_known(sentence):
+                    break # câu này đã thay đổi và sẽ được xét lại
+
+    def probability_map(self):
+        """
+        Returns (probabilities, interior). probabilities maps known mines
+        to 1.0, known safes not yet played to 0.0 and every frontier cell
+        (a cell that appears in a sentence) to its mine probability.
+        interior is the probability for each remaining unknown cell, or
+        None when total_mines is not known.
+
+        Frontier probabilities are exact: the frontier is split into
+        independent components and all consistent mine assignments of
+        each component are counted. With total_mines set, each
+        combination of component assignments is weighted by the number
+        of ways to place the leftover mines in the unconstrained cells.
+        Components too large to enumerate fall back to the highest
+        count/size ratio among the sentences containing the cell, and
+        the interior to the average density of the remaining mines.
+        """
+        probabilities = {}
+        solutions = []
+        frontier = set()
+        approximate = False
+        for component in frontier_components(self.knowledge.values()):
+            key = ComponentCache.key(component)
+            cached, solution = self.component_cache.get(key)
+            if not cached:
+                solution = solve_component(component)
+                cells = set()
+                for sentence in component:
+                    cells.update(sentence.cells)
+                self.component_cache.put(key, solution, cells)
+            if solution is not None:
+                solutions.append(solution)
+                for cells in solution.classes:
+                    frontier.update(cells)
+                continue
+            approximate = True
+            for sentence in component:
+                ratio = sentence.count / sentence.size()
+                for cell in sentence.cells:
+                    frontier.add(cell)
+                    probabilities[cell] = max(probabilities.get(cell, 0.0), ratio)
+
+        interior = None
+        weighted = None
+        if self.total_mines is not None:
+            remaining = self.total_mines - len(self.mines)
+            unknown = len(self.unknown)
+            unconstrained = unknown - len(frontier)
+            if not approximate:
+                weighted, interior = weigh_components(solutions, unconstrained, remaining)
+            if weighted is None and unknown:
+                interior = remaining / unknown if unconstrained else None
+        if weighted is not None:
+            probabilities.update(weighted)
+        else:
+            for solution in solutions:
+                probabilities.update(solution.probabilities())
+
+        for cell in self.mines:
+            probabilities[cell] = 1.0
+        # safe_moves giữ đúng các ô an toàn chưa mở, không cần duyệt cả self.safes
+        for cell in self.safe_moves:
+            probabilities[cell] = 0.0
+        return probabilities, interior
+
+    def mine_probabilities(self):
+        """
+        Returns {cell: probability that the cell is a mine}, as computed
+        by probability_map. When total_mines is known, every other
+        unknown cell is included with the interior probability, which
+        costs O(unknown cells); use probability_map to avoid that.
+        In sparse mode only the cells of probability_map are returned.
+        """
+        probabilities, interior = self.probability_map()
+        if interior is not None and not self.sparse:
+            for cell in self.unknown:
+                if cell not in probabilities:
+                    probabilities[cell] = interior
+        return probabilities
+
+    def make_safe_move(self):
+        """
+        trả về một ô an toàn để chọn trên bảng Dò mìn.
+        Nước đi phải được xác định là an toàn, và chưa phải là nước đi
+        đã được thực hiện.
+        Hàm này có thể sử dụng kiến thức trong self.mines, self.safes
+        và self.moves_made, nhưng không được sửa đổi bất kỳ giá trị nào trong số đó.
+        """
+        # safe_moves giữ sẵn các ô an toàn chưa mở, không cần tính hiệu tập hợp
+        if not self.safe_moves:
+            return None
+        return self.safe_moves[-1]
+
+    def pop_safe_moves(self):
+        """
+        Returns every known safe cell that has not been played yet and
+        clears the pending list, so that they can all be revealed in one
+        Minesweeper.handle_moves call. The caller is expected to play
+        all of them.
+        """
+        moves = list(self.safe_moves)
+        self.safe_moves = self.new_cell_pool()
+        return moves
+
+    def make_random_move(self):
+        """
+        Trả về một nước đoán khi không còn ô an toàn đã biết, chọn trong
+        số các ô:
+        1) chưa được chọn, và
+        2) không được biết là có mìn
+        With the default "probability" strategy the guess is the cell
+        least likely to be a mine (see make_guess_move); with "random"
+        it is drawn uniformly from those cells.
+        """
+        if self.guess == "probability":
+            return self.make_guess_move()
+        # Các ô chưa mở và không phải mìn: ô chưa biết và ô an toàn chưa mở
+        total = len(self.unknown) + len(self.safe_moves)
+        # No moves left
+        if total == 0:
+            return None
+        if self.sparse:
+            # Bảng quá lớn để đánh số: chọn ngẫu nhiên đến khi trúng ô hợp lệ
+            while True:
+                move = (self.rng.randrange(self.height), self.rng.randrange(self.width))
+                if move not in self.mines and move not in self.moves_made:
+                    return move
+        # Return available
+        k = self.rng.randrange(total)
+        if k < len(self.unknown):
+            return self.unknown[k]
+        return self.safe_moves[k - len(self.unknown)]
+
+    def make_guess_move(self):
+        """
+        Returns the unknown cell least likely to be a mine according to
+        probability_map. Ties are broken by information gain: the cell
+        with the fewest unknown neighbours is preferred, since it is the
+        most likely to show a small number (or open an area) and turn
+        its neighbours into constraints. Remaining ties are broken with
+        self.rng. Returns None if no move is left.
+
+        Interior cells (in no sentence) all share one probability, so
+        they are never listed: only the corners and the interior cells
+        next to a frontier, known mine or unplayed safe cell are scored,
+        or one random interior cell when there are none. Without
+        total_mines the interior probability is unknown; the interior
+        is then only chosen when the frontier is empty or riskier than
+        the share of mines among the known cells.
+        """
+        probabilities, interior = self.probability_map()
+        best = None
+        candidates = []
+        frontier = 0
+        for cell, p in probabilities.items():
+            if cell in self.moves_made or cell in self.mines:
+                continue
+            if cell in self.unknown:
+                frontier += 1
+            if best is None or p < best - GUESS_TIE:
+                best = p
+                candidates = [cell]
+            elif p <= best + GUESS_TIE:
+                candidates.append(cell)
+
+        if interior is None and best is not None:
+            # Không biết tổng số mìn: ước lượng mật độ từ các ô đã biết,
+            # nhưng không gộp ô nội vùng vào nhóm hoà với frontier
+            known = len(self.mines) + len(self.safes)
+            use_interior = known > 0 and len(self.mines) / known < best - GUESS_TIE
+            tied = False
+        else:
+            use_interior = best is None or interior <= best + GUESS_TIE
+            tied = best is not None and interior >= best - GUESS_TIE
+
+        if use_interior and len(self.unknown) > frontier:
+            interior_cells = self.interior_candidates(probabilities)
+            if tied:
+                candidates.extend(interior_cells)
+            else:
+                candidates = interior_cells
+        if not candidates:
+            return None
+
+        scores = [self.unknown_neighbour_count(cell) for cell in candidates]
+        fewest = min(scores)
+        candidates = [cell for cell, score in zip(candidates, scores) if score == fewest]
+        return self.rng.choice(candidates)
+
+    def interior_candidates(self, probabilities):
+        """
+        Returns a few interior cells worth scoring: the unknown corners
+        and the unknown neighbours of the cells in probabilities, which
+        are the ones with the fewest unknown neighbours. Falls back to a
+        single random interior cell. Costs O(len(probabilities)), not
+        O(board).
+        """
+        unknown = self.unknown
+        cells = set()
+        if not self.sparse:
+            last_row, last_col = self.height - 1, self.width - 1
+            for corner in ((0, 0), (0, last_col), (last_row, 0), (last_row, last_col)):
+                if corner in unknown and corner not in probabilities:
+                    cells.add(corner)
+        for i, j in probabilities:
+            for row in range(max(i - 1, 0), min(i + 2, self.height)):
+                for col in range(max(j - 1, 0), min(j + 2, self.width)):
+                    if (row, col) in unknown and (row, col) not in probabilities:
+                        cells.add((row, col))
+        if cells:
+            return list(cells)
+
+        if self.sparse:
+            cell = unknown.sample(self.rng, probabilities)
+            return [cell] if cell is not None else []
+        # Chọn ngẫu nhiên trong pool, bỏ qua các ô frontier
+        for _ in range(64):
+            cell = unknown[self.rng.randrange(len(unknown))]
+            if cell not in probabilities:
+                return [cell]
+        return [cell for cell in unknown if cell not in probabilities][:1]
+
+    def unknown_neighbour_count(self, cell):
+        # Số ô lân cận chưa biết là an toàn hay mìn
+        i, j = cell
+        count = 0
+        for row in range(max(i - 1, 0), min(i + 2, self.height)):
+            for col in range(max(j - 1, 0), min(j + 2, self.width)):
+                if (row, col) != cell and (row, col) not in self.safes \
+                        and (row, col) not in self.mines:
+                    count += 1
+        return count
+
+    def get_cell_neighbors(self, cell, count):
+        #Tìm ra danh sách hàng xóm chưa biết quanh ô đó.
+        #Điều chỉnh lại số mìn count nếu trong các hàng xóm đã có ô nào chắc chắn là mìn.
+        i, j = cell
+        neighbors = []
+        unknown = self.unknown.members
+        mines = self.mines
+        # quét hình vuông 3x3 quanh cell, đã cắt theo mép bảng
+        cols = range(max(j - 1, 0), min(j + 2, self.width))
+        for row in range(max(i - 1, 0), min(i + 2, self.height)):
+            for col in cols:
+                neighbor = (row, col)
+                #lọc ô chưa nằm trong an toàn hoặc mìn
+                if neighbor in unknown and neighbor != cell:
+                    neighbors.append(neighbor)
+                elif neighbor in mines: # nếu ô nằm trong mines thì giảm count đi 1
+                    count -= 1
+
+        return neighbors, count
+
+    def remove_dups(self):
+        # Trùng lặp đã bị loại khi thêm câu (add_sentence/rekey_sentence);
+        # chỉ dựng lại dict theo khóa hiện tại của từng câu
+        unique_knowledge = {}
+        for s in self.knowledge.values():
+            key = s.key()
+            if key not in unique_knowledge:
+                unique_knowledge[key] = s
+            else:
+                self.unindex_sentence(s)
+        self.knowledge = unique_knowledge
+
+    def remove_sures(self):
+        for s in list(self.knowledge.values()):
+            # mark_mine/mark_safe shrink s.cells in place, so iterate a copy
+            if s.known_mines():  # nếu có ô mìn chắc chắn
+                for mineFound in list(s.known_mines()):
+                    self.mark_mine(mineFound) # thêm vào mìn
+                self.discard_sentence(s)#loại bỏ câu đó
+            elif s.known_safes():# nếu có ô an toàn chắc chắn
+                for safeFound in list(s.known_safes()):
+                    self.mark_safe(safeFound)# thêm vào ô an toàn 
+                self.discard_sentence(s)#loại bỏ câu đó
@@ -1,151 +1,546 @@
-import random
-
-class Minesweeper():
-    """
-    Minesweeper game representation
-    """
-
-    def __init__(self, height=8, width=8, mines=8):
-
-        # Set initial width, height, and number of mines
-        self.height = height
-        self.width = width
-        self.mines = set() #lưu tọa độ boom
-
-        # Initialize an empty field with no mines
-        self.board = []# tạo  dạng lưới 2d 
-        for i in range(self.height):
-            row = []
-            for j in range(self.width):
-                row.append(False)
-            self.board.append(row)
-
-        # Add mines randomly
-        self.total_mines = mines
-        self.first_move_made = False
-        self.mines_initialized = False
-
-        # At first, player has found no mines
-        self.mines_found = set()
-
-        self.total_mines = mines
-        self.first_move_made = False # theo dõi các ô người chơi đánh dấu và ai đánh dấu 
-
-    def print(self):
-        # Prints a text-based representation of where mines are located.
-        for i in range(self.height):
-            print("--" * self.width + "-")
-            for j in range(self.width):
-                if self.board[i][j]:
-                    print("|X", end="")
-                else:
-                    print("| ", end="")
-            print("|")
-        print("--" * self.width + "-")
-
-    def is_mine(self, cell): # kiểm tra xem ô có phải là bom không
-        i, j = cell
-        return self.board[i][j]
-
-    def nearby_mines(self, cell): # đếm mìn trong ô lân cận 
-        """
-        Returns the number of mines that are
-        within one row and column of a given cell,
-        not including the cell itself.
-        """
-
-        # Keep count of nearby mines
-        count = 0
-
-        # Loop over all cells within one row and column
-        for i in range(cell[0] - 1, cell[0] + 2):
-            for j in range(cell[1] - 1, cell[1] + 2):
-
-                # Ignore the cell itself
-                if (i, j) == cell:
-                    continue
-
-                # Update count if cell in bounds and is mine
-                if 0 <= i < self.height and 0 <= j < self.width:
-                    if self.board[i][j]:
-                        count += 1
-
-        return count
-
-    def won(self):
-        # Checks if all mines have been flagged.
-        return self.mines_found == self.mines
-
-    def place_mines(self, start_cell):
-        # Đặt mìn, tránh ô đầu tiên và lân cận.
-        i0, j0 = start_cell
-        protected = set()
-        for i in range(i0 - 1, i0 + 2):
-            for j in range(j0 - 1, j0 + 2):
-                if 0 <= i < self.height and 0 <= j < self.width:
-                    protected.add((i, j))
-
-        while len(self.mines) < self.total_mines:
-            i = random.randrange(self.height)
-            j = random.randrange(self.width)
-            if (i, j) not in protected and (i, j) not in self.mines:
-                self.mines.add((i, j))
-                self.board[i][j] = True
-    def flood_fill_reveal(self, cell, ai, revealed, flags):
-        """
-        Recursively reveals blank tiles (with 0 adjacent mines) and their neighbors.
-        """
-        queue = [cell]
-        visited = set()
-        while queue:
-            current = queue.pop()
-            if current in visited or current in revealed:
-                continue
-            visited.add(current)
-            revealed.add(current)
-            nearby = self.nearby_mines(current)
-            ai.add_knowledge(current, nearby)
-            if nearby == 0:
-                i, j = current
-                for ni in range(i - 1, i + 2):
-                    for nj in range(j - 1, j + 2):
-                        if (
-                            0 <= ni < self.height and
-                            0 <= nj < self.width and
-                            (ni, nj) not in revealed and
-                            (ni, nj) not in flags
-                        ):
-                            queue.append((ni, nj))
-
-    def handle_move(self, move, ai, revealed, flags):
-        """
-        Handles a move made by the player or AI.
-        Returns a tuple (lost, mine_detonated) to indicate game over state.
-        """
-        lost = False
-        mine_detonated = None
-        if not self.mines_initialized:
-            self.place_mines(move)
-            self.mines_initialized = True
-
-        if self.is_mine(move):
-            lost = True
-            mine_detonated = move
-        else:
-            nearby = self.nearby_mines(move)
-            if nearby == 0:
-                self.flood_fill_reveal(move, ai, revealed, flags)
-            else:
-                revealed.add(move)
-            ai.add_knowledge(move, nearby)
-
-        return lost, mine_detonated
-
-    def reset_game(self, height=None, width=None, mines=None):
-        """
-        Resets the game state.
-        """
-        if height: self.height = height
-        if width: self.width = width
-        if mines: self.total_mines = mines
-        self.__init__(self.height, self.width, self.total_mines)
+import random
+from collections.abc import MutableSet
+
+try:
+    import numpy as np
+except ImportError:  # numpy is only needed for ArrayMinesweeper
+    np = None
+
+
+def protected_indices(height, width, start_cell):
+    """
+    Returns the sorted flat indices (i * width + j) of the first move
+    and its in-bounds neighbours, which never hold a mine.
+    """
+    i0, j0 = start_cell
+    return [
+        i * width + j
+        for i in range(max(i0 - 1, 0), min(i0 + 2, height))
+        for j in range(max(j0 - 1, 0), min(j0 + 2, width))
+    ]
+
+
+def check_mine_count(total_mines, available):
+    if not 0 <= total_mines <= available:
+        raise ValueError(
+            f"cannot place {total_mines} mines: only {available} cells are "
+            f"available outside the first move's neighbourhood"
+        )
+
+
+def sample_mine_indices(height, width, total_mines, start_cell, rng=random):
+    """
+    Chooses mine positions as flat indices (i * width + j), uniformly
+    among the cells outside the 3x3 area around start_cell.
+
+    Samples total_mines distinct ranks from the eligible cells with
+    rng.sample and shifts each rank past the protected indices below
+    it, so the cost does not depend on the mine density (unlike
+    retrying random cells until enough free ones are hit).
+    Raises ValueError if the mines do not fit.
+    """
+    protected = protected_indices(height, width, start_cell)
+    available = height * width - len(protected)
+    check_mine_count(total_mines, available)
+
+    # Ranks at or past `after` land beyond every protected cell
+    after = protected[-1] - len(protected) + 1
+    indices = []
+    for index in rng.sample(range(available), total_mines):
+        if index >= after:
+            index += len(protected)
+        else:
+            for p in protected:
+                if index < p:
+                    break
+                index += 1
+        indices.append(index)
+    return indices
+
+class Minesweeper():
+    """
+    Minesweeper game representation
+    """
+
+    def __init__(self, height=8, width=8, mines=8, rng=None):
+
+        # Set initial width, height, and number of mines
+        self.height = height
+        self.width = width
+        self.mines = set() #lưu tọa độ boom
+
+        # Random source for mine placement; pass a seeded random.Random
+        # to make the layout reproducible
+        self.rng = rng if rng is not None else random
+
+        # Initialize an empty field with no mines
+        self.board = []# tạo  dạng lưới 2d 
+        for i in range(self.height):
+            row = []
+            for j in range(self.width):
+                row.append(False)
+            self.board.append(row)
+
+        # Number of mines around each cell, filled in by place_mines
+        self.counts = [[0] * self.width for _ in range(self.height)]
+
+        # Add mines randomly
+        self.total_mines = mines
+        self.first_move_made = False
+        self.mines_initialized = False
+
+        # At first, player has found no mines
+        self.mines_found = set()
+
+        self.total_mines = mines
+        self.first_move_made = False # theo dõi các ô người chơi đánh dấu và ai đánh dấu 
+
+    def print(self):
+        # Prints a text-based representation of where mines are located.
+        for i in range(self.height):
+            print("--" * self.width + "-")
+            for j in range(self.width):
+                if self.board[i][j]:
+                    print("|X", end="")
+                else:
+                    print("| ", end="")
+            print("|")
+        print("--" * self.width + "-")
+
+    def is_mine(self, cell): # kiểm tra xem ô có phải là bom không
+        i, j = cell
+        return self.board[i][j]
+
+    def nearby_mines(self, cell): # đếm mìn trong ô lân cận 
+        """
+        Returns the number of mines that are
+        within one row and column of a given cell,
+        not including the cell itself.
+        Answered from the count grid built by place_mines.
+        """
+        i, j = cell
+        return self.counts[i][j]
+
+    def compute_counts(self):
+        """
+        Builds the neighbour-count grid: counts[i][j] is the number of
+        mines around (i, j). Sums each row over a 3-wide window, then
+        adds the row sums above and below and removes the cell itself,
+        so the cost is O(cells) whatever the mine density.
+        """
+        row_sums = []
+        for row in self.board:
+            padded = [False] + row + [False]
+            row_sums.append([a + b + c for a, b, c in zip(padded, padded[1:], padded[2:])])
+
+        zeros = [0] * self.width
+        counts = []
+        for i, row in enumerate(self.board):
+            above = row_sums[i - 1] if i > 0 else zeros
+            below = row_sums[i + 1] if i + 1 < self.height else zeros
+            counts.append([
+                a + m + b - x
+                for a, m, b, x in zip(above, row_sums[i], below, row)
+            ])
+        self.counts = counts
+
+    def won(self):
+        # Checks if all mines have been flagged.
+        return self.mines_found == self.mines
+
+    def place_mines(self, start_cell):
+        # Đặt mìn, tránh ô đầu tiên và lân cận.
+        for index in sample_mine_indices(self.height, self.width,
+                                         self.total_mines, start_cell, self.rng):
+            i, j = divmod(index, self.width)
+            self.mines.add((i, j))
+            self.board[i][j] = True
+        self.compute_counts()
+
+    def mine_bitmap(self):
+        """
+        Returns the mine layout as a bytearray of height * width bytes in
+        row-major order, 1 for a mine and 0 otherwise.
+        """
+        bitmap = bytearray(self.height * self.width)
+        for i, j in self.mines:
+            bitmap[i * self.width + j] = 1
+        return bitmap
+
+    def load_bitmap(self, bitmap):
+        """
+        Sets the mine layout from a sequence of height * width bytes in
+        the mine_bitmap() format, e.g. to replay a recorded game. The
+        first move then keeps this layout instead of placing mines.
+        """
+        width = self.width
+        self.board = [
+            [bool(b) for b in bitmap[i * width:(i + 1) * width]]
+            for i in range(self.height)
+        ]
+        self.mines = {divmod(index, width) for index, b in enumerate(bitmap) if b}
+        self.total_mines = len(self.mines)
+        self.mines_initialized = True
+        self.compute_counts()
+
+    def open_region(self, cell, revealed, flags):
+        """
+        Reveals cell and, if it has no adjacent mines, the blank region
+        around it, without telling the AI. Returns the newly revealed
+        cells as a list of (cell, nearby mines) in reveal order.
+        """
+        opened = []
+        if cell in revealed:
+            return opened
+        # Mỗi ô chỉ được đưa vào hàng đợi một lần
+        queue = [cell]
+        queued = {cell}
+        while queue:
+            current = queue.pop()
+            revealed.add(current)
+            nearby = self.nearby_mines(current)
+            opened.append((current, nearby))
+            if nearby == 0:
+                i, j = current
+                cols = range(max(j - 1, 0), min(j + 2, self.width))
+                for ni in range(max(i - 1, 0), min(i + 2, self.height)):
+                    for nj in cols:
+                        neighbor = (ni, nj)
+                        if (
+                            neighbor not in queued and
+                            neighbor not in revealed and
+                            neighbor not in flags
+                        ):
+                            queued.add(neighbor)
+                            queue.append(neighbor)
+        return opened
+
+    def flood_fill_reveal(self, cell, ai, revealed, flags):
+        """
+        Recursively reveals blank tiles (with 0 adjacent mines) and their neighbors.
+        The AI receives the whole region in one add_knowledge_bulk call.
+        """
+        ai.add_knowledge_bulk(self.open_region(cell, revealed, flags))
+
+    def handle_move(self, move, ai, revealed, flags):
+        """
+        Handles a move made by the player or AI.
+        Returns a tuple (lost, mine_detonated) to indicate game over state.
+        """
+        lost = False
+        mine_detonated = None
+        if not self.mines_initialized:
+            self.place_mines(move)
+            self.mines_initialized = True
+
+        if self.is_mine(move):
+            lost = True
+            mine_detonated = move
+        else:
+            nearby = self.nearby_mines(move)
+            if nearby == 0:
+                self.flood_fill_reveal(move, ai, revealed, flags)
+            else:
+                revealed.add(move)
+                ai.add_knowledge(move, nearby)
+
+        return lost, mine_detonated
+
+    def handle_moves(self, moves, ai, revealed, flags):
+        """
+        Handles a batch of moves, typically every safe cell the AI
+        already knows (see MinesweeperAI.pop_safe_moves). All cells are
+        revealed first and the AI gets their numbers in a single
+        add_knowledge_bulk call, so inference runs once per batch.
+        Stops at the first mine; the cells revealed before it are still
+        reported to the AI.
+        Returns a tuple (lost, mine_detonated) like handle_move.
+        """
+        lost = False
+        mine_detonated = None
+        opened = []
+        for move in moves:
+            if not self.mines_initialized:
+                self.place_mines(move)
+                self.mines_initialized = True
+            if move in revealed:
+                continue # đã mở bởi vùng loang của một nước trước
+            if self.is_mine(move):
+                lost = True
+                mine_detonated = move
+                break
+            opened.extend(self.open_region(move, revealed, flags))
+        if opened:
+            ai.add_knowledge_bulk(opened)
+        return lost, mine_detonated
+
+    def reset_game(self, height=None, width=None, mines=None):
+        """
+        Resets the game state.
+        """
+        if height: self.height = height
+        if width: self.width = width
+        if mines: self.total_mines = mines
+        self.__init__(self.height, self.width, self.total_mines, self.rng)
+
+
+class CellMask(MutableSet):
+    """
+    Set of (row, col) cells stored as a boolean ndarray.
+    Behaves like the revealed/flags sets passed to handle_move,
+    but costs one byte per board cell instead of one tuple per member.
+    """
+
+    def __init__(self, mask):
+        self.mask = mask
+        self.height, self.width = mask.shape
+        self.size = int(mask.sum())
+
+    def __contains__(self, cell):
+        i, j = cell
+        return 0 <= i < self.height and 0 <= j < self.width and bool(self.mask[i, j])
+
+    def __iter__(self):
+        for i, j in zip(*np.nonzero(self.mask)):
+            yield (int(i), int(j))
+
+    def __len__(self):
+        return self.size
+
+    def add(self, cell):
+        if not self.mask[cell]:
+            self.mask[cell] = True
+            self.size += 1
+
+    def discard(self, cell):
+        if cell in self:
+            self.mask[cell] = False
+            self.size -= 1
+
+    def clear(self):
+        self.mask[:] = False
+        self.size = 0
+
+    def copy(self):
+        return set(self)
+
+
+class ArrayMinesweeper(Minesweeper):
+    """
+    Minesweeper with the board stored in numpy arrays: a bool mine mask,
+    a uint8 neighbour-count grid computed in one vectorized pass, and
+    CellMask revealed/flags state. is_mine, nearby_mines and handle_move
+    work as in Minesweeper; pass game.revealed and game.flags to
+    handle_move to keep the per-cell state in arrays as well.
+    """
+
+    def __init__(self, height=8, width=8, mines=8, rng=None):
+        if np is None:
+            raise ImportError("ArrayMinesweeper requires numpy")
+
+        self.height = height
+        self.width = width
+        self.rng = rng if rng is not None else random
+
+        # board[i][j] still works on the mask, so print() is unchanged
+        self.board = np.zeros((height, width), dtype=bool)
+        self.counts = np.zeros((height, width), dtype=np.uint8)
+        self.mines = CellMask(self.board)
+
+        self.revealed = CellMask(np.zeros((height, width), dtype=bool))
+        self.flags = CellMask(np.zeros((height, width), dtype=bool))
+
+        self.total_mines = mines
+        self.first_move_made = False
+        self.mines_initialized = False
+        self.mines_found = set()
+
+    def is_mine(self, cell):
+        return bool(self.board[cell])
+
+    def nearby_mines(self, cell):
+        return int(self.counts[cell])
+
+    def compute_counts(self):
+        """
+        Sums the eight shifted copies of the zero-padded mine mask,
+        which is a 3x3 convolution without the centre term.
+        """
+        padded = np.pad(self.board.astype(np.uint8), 1)
+        counts = np.zeros((self.height, self.width), dtype=np.uint8)
+        for di in range(3):
+            for dj in range(3):
+                if di == 1 and dj == 1:
+                    continue
+                counts += padded[di:di + self.height, dj:dj + self.width]
+        self.counts = counts
+
+    def place_mines(self, start_cell):
+        """
+        Chooses all mines at once among the cells outside the 3x3 area
+        around start_cell. The numpy generator is seeded from self.rng,
+        so a seeded rng still gives a reproducible layout.
+        """
+        eligible = np.ones(self.height * self.width, dtype=bool)
+        eligible[protected_indices(self.height, self.width, start_cell)] = False
+        eligible = np.flatnonzero(eligible)
+        check_mine_count(self.total_mines, len(eligible))
+
+        generator = np.random.default_rng(self.rng.getrandbits(64))
+        chosen = generator.choice(len(eligible), size=self.total_mines, replace=False)
+        self.board.flat[eligible[chosen]] = True
+        self.mines.size = self.total_mines
+        self.compute_counts()
+
+    def mine_bitmap(self):
+        return bytearray(self.board.astype(np.uint8).tobytes())
+
+    def load_bitmap(self, bitmap):
+        mask = np.frombuffer(bytes(bitmap), dtype=np.uint8).reshape(self.height, self.width)
+        self.board[:] = mask.astype(bool)
+        self.mines.size = int(self.board.sum())
+        self.total_mines = self.mines.size
+        self.mines_initialized = True
+        self.compute_counts()
+
+
+# Side of an "unbounded" ChunkedMinesweeper. Coordinates stay
+# non-negative, so start exploring near UNBOUNDED // 2; the cell count
+# still fits in an index-sized integer, so len() works on cell views.
+UNBOUNDED = 1 << 31
+
+# Below about 10% mines the blank cells of an unbounded board connect
+# into one infinite region and a flood fill never ends; keep a margin.
+MIN_UNBOUNDED_DENSITY = 0.12
+
+
+class ChunkedMinesweeper(Minesweeper):
+    """
+    Minesweeper board generated lazily in square chunks.
+
+    Nothing is allocated per board cell. A chunk of chunk_size x
+    chunk_size cells gets its mines the first time a cell in it (or next
+    to it) is looked at. Each chunk holds round(density * cells) mines
+    drawn with random.Random seeded from (seed, chunk row, chunk col),
+    so a chunk has the same layout whatever order the board is explored
+    in. The 3x3 area around the first move is then cleared.
+    Memory grows with the explored area, not with the board size.
+
+    height and width may be None for an unbounded board (UNBOUNDED
+    cells a side). Its density must be at least MIN_UNBOUNDED_DENSITY so
+    that blank regions stay finite; a flood fill on an unbounded board
+    with fewer mines may never end.
+    Play it with MinesweeperAI(sparse=True).
+    """
+
+    def __init__(self, height=None, width=None, density=0.2, seed=0, chunk_size=32):
+        self.height = UNBOUNDED if height is None else height
+        self.width = UNBOUNDED if width is None else width
+        if UNBOUNDED in (self.height, self.width) and density < MIN_UNBOUNDED_DENSITY:
+            raise ValueError(
+                f"density {density} is too low for an unbounded board: blank regions "
+                f"may never end (minimum {MIN_UNBOUNDED_DENSITY})"
+            )
+        self.density = density
+        self.seed = seed
+        self.chunk_size = chunk_size
+
+        # (chunk row, chunk col) -> bytearray of chunk_size * chunk_size
+        # bytes, 1 for a mine
+        self.chunks = {}
+        self.start_cell = None
+
+        self.total_mines = None
+        self.first_move_made = False
+        self.mines_initialized = False
+        self.mines_found = set()
+
+    @property
+    def mines(self):
+        """
+        Set of the mines in the chunks generated so far.
+        """
+        size = self.chunk_size
+        mines = set()
+        for (ci, cj), bits in self.chunks.items():
+            index = bits.find(1)
+            while index != -1:
+                r, c = divmod(index, size)
+                mines.add((ci * size + r, cj * size + c))
+                index = bits.find(1, index + 1)
+        return mines
+
+    def chunk(self, ci, cj):
+        bits = self.chunks.get((ci, cj))
+        if bits is None:
+            bits = self.chunks[(ci, cj)] = self.generate_chunk(ci, cj)
+        return bits
+
+    def generate_chunk(self, ci, cj):
+        size = self.chunk_size
+        top = ci * size
+        left = cj * size
+        # Các chunk ở mép bảng có thể nhỏ hơn
+        rows = min(size, self.height - top)
+        cols = min(size, self.width - left)
+        rng = random.Random(f"{self.seed}:{ci}:{cj}")
+        bits = bytearray(size * size)
+        for index in rng.sample(range(rows * cols), round(self.density * rows * cols)):
+            r, c = divmod(index, cols)
+            bits[r * size + c] = 1
+        if self.start_cell is not None:
+            i0, j0 = self.start_cell
+            for i in range(max(i0 - 1, top), min(i0 + 2, top + rows)):
+                for j in range(max(j0 - 1, left), min(j0 + 2, left + cols)):
+                    bits[(i - top) * size + (j - left)] = 0
+        return bits
+
+    def is_mine(self, cell):
+        i, j = cell
+        size = self.chunk_size
+        return self.chunk(i // size, j // size)[(i % size) * size + j % size] == 1
+
+    def nearby_mines(self, cell):
+        i, j = cell
+        count = 0
+        for row in range(max(i - 1, 0), min(i + 2, self.height)):
+            for col in range(max(j - 1, 0), min(j + 2, self.width)):
+                if (row, col) != cell and self.is_mine((row, col)):
+                    count += 1
+        return count
+
+    def compute_counts(self):
+        # Counts are computed on demand by nearby_mines
+        pass
+
+    def place_mines(self, start_cell):
+        """
+        Records the first move; chunks are generated lazily and keep
+        its 3x3 area free of mines.
+        """
+        self.start_cell = start_cell
+
+    def print(self):
+        raise ValueError("a chunked board is too large to print")
+
+    def mine_bitmap(self):
+        """
+        Returns the full mine layout of a bounded board, generating
+        every chunk.
+        """
+        if self.height == UNBOUNDED or self.width == UNBOUNDED:
+            raise ValueError("an unbounded board has no finite mine bitmap")
+        size = self.chunk_size
+        bitmap = bytearray(self.height * self.width)
+        for i in range(self.height):
+            for j in range(self.width):
+                if self.chunk(i // size, j // size)[(i % size) * size + j % size]:
+                    bitmap[i * self.width + j] = 1
+        return bitmap
+
+    def load_bitmap(self, bitmap):
+        raise ValueError("a chunked board generates its layout from its seed")
+
+    def reset_game(self, height=None, width=None, mines=None):
+        self.__init__(height or self.height, width or self.width,
+                      self.density, self.seed, self.chunk_size)
@@ -0,0 +1,266 @@
+"""
+Transposition table of local deductions.
+
+The same 5x5 neighbourhood of revealed numbers, known mines and unknown
+cells keeps reappearing within a game and across games, and always
+yields the same safe/mine deductions. PatternTable memoizes them under a
+canonical encoding of the window, reduced over the 8 rotations and
+reflections of the square, and can be saved to and warm-loaded from a
+JSON file.
+
+Window encoding, one character per cell in row-major order:
+    '0'-'8'  revealed number in the centre 3x3 (whose neighbours all lie
+             inside the window) that still has unknown neighbours, minus
+             the known mines around it
+    '?'      unknown cell next to such a number
+    '.'      anything else: outside the board, known safe or mine,
+             revealed, or unknown but not constrained by the window
+Everything that cannot change the deductions is folded into '.', so
+many concrete situations share one entry.
+"""
+import json
+import os
+from operator import itemgetter
+
+from csp import Sentence, frontier_components, solve_component
+
+SIZE = 5
+RADIUS = SIZE // 2
+CELLS = SIZE * SIZE
+
+
+def _transforms():
+    """
+    For each of the 8 symmetries of the square, the list `order` such
+    that canonical position q reads the original window at order[q].
+    """
+    maps = [
+        lambda r, c: (r, c),
+        lambda r, c: (c, -r),
+        lambda r, c: (-r, -c),
+        lambda r, c: (-c, r),
+        lambda r, c: (r, -c),
+        lambda r, c: (-r, c),
+        lambda r, c: (c, r),
+        lambda r, c: (-c, -r),
+    ]
+    orders = []
+    for f in maps:
+        order = []
+        for q in range(CELLS):
+            r, c = f(q // SIZE - RADIUS, q % SIZE - RADIUS)
+            order.append((r + RADIUS) * SIZE + (c + RADIUS))
+        orders.append(order)
+    return orders
+
+
+TRANSFORMS = _transforms()
+GETTERS = [itemgetter(*order) for order in TRANSFORMS]
+
+# (row offset, col offset) of each window position from the centre
+OFFSETS = [(p // SIZE - RADIUS, p % SIZE - RADIUS) for p in range(CELLS)]
+
+DIGITS = "012345678"
+
+# Centre 3x3 positions with (position, row offset, col offset) of
+# their 8 neighbours
+INNER = [
+    (r * SIZE + c, tuple(
+        (nr * SIZE + nc, nr - RADIUS, nc - RADIUS)
+        for nr in range(r - 1, r + 2)
+        for nc in range(c - 1, c + 2)
+        if (nr, nc) != (r, c)
+    ))
+    for r in range(1, SIZE - 1)
+    for c in range(1, SIZE - 1)
+]
+
+
+def encode_window(ai, cell):
+    """
+    Encodes the 5x5 window of a MinesweeperAI around a revealed cell.
+    Returns None when fewer than two numbers in the window still
+    constrain unknown cells: a single sentence only yields deductions
+    that propagation finds on its own.
+    Only the numbers of the centre 3x3 and their neighbours are looked
+    at, so a window with fewer than two numbers costs nine lookups.
+    """
+    i, j = cell
+    numbers = ai.numbers
+    centre = []
+    for p, around in INNER:
+        di, dj = OFFSETS[p]
+        number = numbers.get((i + di, j + dj))
+        if number is not None:
+            centre.append((around, p, number))
+    if len(centre) < 2:
+        return None
+
+    height, width = ai.height, ai.width
+    mines, safes = ai.mines, ai.safes
+    # Cửa sổ nằm trọn trong bảng thì khỏi kiểm tra biên từng ô
+    inside = RADIUS <= i < height - RADIUS and RADIUS <= j < width - RADIUS
+    # Trạng thái từng ô chỉ tính khi cần: 0 đã biết/ngoài bảng, 1 mìn, 2 chưa biết
+    state = [None] * CELLS
+    window = ["."] * CELLS
+    active = 0
+    for around, p, number in centre:
+        open_cells = []
+        for q, di, dj in around:
+            known = state[q]
+            if known is None:
+                row = i + di
+                col = j + dj
+                if not (inside or 0 <= row < height and 0 <= col < width):
+                    known = 0
+                elif (row, col) in safes:
+                    known = 0
+                elif (row, col) in mines:
+                    known = 1
+                else:
+                    known = 2
+                state[q] = known
+            if known == 2:
+                open_cells.append(q)
+            elif known == 1:
+                number -= 1
+        if open_cells:
+            active += 1
+            window[p] = DIGITS[number]
+            for q in open_cells:
+                window[q] = "?"
+    if active < 2:
+        return None
+    return "".join(window)
+
+
+def solve_window(key):
+    """
+    Returns (safes, mines): the window positions that are safe or mines
+    in every assignment consistent with the numbers of the centre 3x3.
+    """
+    sentences = []
+    for r in range(1, SIZE - 1):
+        for c in range(1, SIZE - 1):
+            number = key[r * SIZE + c]
+            if not number.isdigit():
+                continue
+            cells = [
+                nr * SIZE + nc
+                for nr in range(r - 1, r + 2)
+                for nc in range(c - 1, c + 2)
+                if key[nr * SIZE + nc] == "?"
+            ]
+            if cells:
+                sentences.append(Sentence(cells, int(number)))
+
+    safes = []
+    mines = []
+    for component in frontier_components(sentences):
+        solution = solve_component(component)
+        if solution is None:
+            continue
+        for position, p in solution.probabilities().items():
+            if p == 0:
+                safes.append(position)
+            elif p == 1:
+                mines.append(position)
+    return sorted(safes), sorted(mines)
+
+
+class PatternTable():
+    """
+    Memo table from canonical 5x5 windows to their deductions.
+    A single table can be shared by many MinesweeperAI instances.
+    Windows already seen as they are, before symmetry reduction, are
+    also kept in `windows` with their deductions in their own
+    positions, so a repeated window is not canonicalized again; only
+    the canonical table is saved.
+    """
+
+    def __init__(self):
+        self.table = {}
+        self.windows = {}
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def canonical(window):
+        """
+        Returns (key, order) for a window given as a sequence of 25
+        state characters: the smallest encoding over all symmetries and
+        the transform that produced it.
+        """
+        best = None
+        for getter, order in zip(GETTERS, TRANSFORMS):
+            key = "".join(getter(window))
+            if best is None or key < best[0]:
+                best = (key, order)
+        return best
+
+    def deductions(self, window):
+        """
+        Returns (safes, mines) as positions of the given window, solving
+        and storing the pattern on a miss. The lists are shared; do not
+        modify them.
+        """
+        entry = self.windows.get(window)
+        if entry is not None:
+            self.hits += 1
+            return entry
+        key, order = self.canonical(window)
+        entry = self.table.get(key)
+        if entry is None:
+            self.misses += 1
+            entry = self.table[key] = solve_window(key)
+        else:
+            self.hits += 1
+        safes, mines = entry
+        entry = self.windows[window] = ([order[q] for q in safes], [order[q] for q in mines])
+        return entry
+
+    def deduce(self, ai, cell):
+        """
+        Returns (safes, mines) as board cells for the window of ai
+        around the revealed cell.
+        """
+        window = encode_window(ai, cell)
+        if window is None:
+            return [], []
+        safes, mines = self.deductions(window)
+        if not safes and not mines:
+            return [], []
+        i, j = cell
+        return (
+            [(i + OFFSETS[p][0], j + OFFSETS[p][1]) for p in safes],
+            [(i + OFFSETS[p][0], j + OFFSETS[p][1]) for p in mines],
+        )
+
+    def stats(self):
+        return {"patterns": len(self.table), "hits": self.hits, "misses": self.misses}
+
+    def save(self, path):
+        with open(path, "w") as f:
+            json.dump({"size": SIZE, "patterns": self.table}, f, separators=(",", ":"))
+
+    def load(self, path):
+        """
+        Merges the patterns saved in path into this table.
+        """
+        with open(path) as f:
+            data = json.load(f)
+        if data.get("size") != SIZE:
+            raise ValueError(f"{path} holds {data.get('size')}x{data.get('size')} patterns, expected {SIZE}x{SIZE}")
+        for key, (safes, mines) in data["patterns"].items():
+            self.table.setdefault(key, (safes, mines))
+
+    @classmethod
+    def from_file(cls, path):
+        """
+        Returns a table warm-loaded from path, or an empty one if the
+        file does not exist yet.
+        """
+        table = cls()
+        if os.path.exists(path):
+            table.load(path)
+        return table
@@ -0,0 +1,226 @@
+"""
+Compact game recordings and deterministic replay.
+
+A recording file holds one game per line, as a JSON object:
+    {"v": 1, "seed": 5, "index": 12, "height": 16, "width": 30,
+     "mines": 99, "layout": "<base64>", "moves": [245, [3, 17, 40]],
+     "won": false}
+layout is the mine bitmap packed 8 cells per byte, most significant bit
+first, in base64. Each entry of moves is either a flat cell index
+i * width + j played with Minesweeper.handle_move, or a list of them
+played together with handle_moves. Files whose name ends in .gz are
+gzip-compressed.
+
+Files are written and read one line at a time, so a corpus of any size
+can be streamed. Replaying loads the recorded layout (no RNG is
+involved) and feeds the recorded moves to the game and to a fresh
+MinesweeperAI, so two solver versions can be timed on exactly the same
+inputs.
+"""
+import base64
+import gzip
+import json
+import time
+from collections import namedtuple
+
+from game import Minesweeper
+from csp import MinesweeperAI
+
+FORMAT_VERSION = 1
+
+# layout is the unpacked mine bitmap (mine_bitmap() format)
+GameRecord = namedtuple(
+    "GameRecord", ["seed", "index", "height", "width", "mines", "layout", "moves", "won"]
+)
+
+# matches tells whether the replay ended like the recorded game
+ReplayResult = namedtuple("ReplayResult", ["won", "moves", "seconds", "matches"])
+
+
+def pack_bitmap(bitmap):
+    packed = bytearray((len(bitmap) + 7) // 8)
+    index = bitmap.find(1)
+    while index != -1:
+        packed[index >> 3] |= 0x80 >> (index & 7)
+        index = bitmap.find(1, index + 1)
+    return bytes(packed)
+
+
+def unpack_bitmap(packed, size):
+    bitmap = bytearray(size)
+    for byte_index, byte in enumerate(packed):
+        if byte:
+            for bit in range(8):
+                if byte & (0x80 >> bit):
+                    bitmap[byte_index * 8 + bit] = 1
+    return bitmap
+
+
+def encode_record(record):
+    """
+    Returns the one-line text form of a GameRecord, without newline.
+    """
+    return json.dumps({
+        "v": FORMAT_VERSION,
+        "seed": record.seed,
+        "index": record.index,
+        "height": record.height,
+        "width": record.width,
+        "mines": record.mines,
+        "layout": base64.b64encode(pack_bitmap(record.layout)).decode("ascii"),
+        "moves": record.moves,
+        "won": record.won,
+    }, separators=(",", ":"))
+
+
+def decode_record(line):
+    data = json.loads(line)
+    if data.get("v") != FORMAT_VERSION:
+        raise ValueError(f"unsupported recording version {data.get('v')!r}")
+    height, width = data["height"], data["width"]
+    layout = unpack_bitmap(base64.b64decode(data["layout"]), height * width)
+    return GameRecord(data["seed"], data["index"], height, width, data["mines"],
+                      layout, data["moves"], data["won"])
+
+
+def open_recording(path, mode="r"):
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t")
+    return open(path, mode)
+
+
+def read_records(path):
+    """
+    Yields the GameRecords of a recording file one at a time.
+    """
+    with open_recording(path) as f:
+        for line in f:
+            if line.strip():
+                yield decode_record(line)
+
+
+class RecordWriter():
+    """
+    Appends GameRecords to a recording file, one line each.
+    """
+
+    def __init__(self, path, mode="w"):
+        self.file = open_recording(path, mode)
+        self.count = 0
+
+    def write(self, record):
+        self.file.write(encode_record(record) + "\n")
+        self.count += 1
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class GameRecorder():
+    """
+    Collects the moves of one game as they are played; pass it to
+    simulate.play_game. After the game, record holds the GameRecord.
+    """
+
+    def __init__(self, seed=None, index=None):
+        self.seed = seed
+        self.index = index
+        self.game = None
+        self.moves = []
+        self.record = None
+
+    def begin(self, game):
+        self.game = game
+
+    def move(self, cell):
+        self.moves.append(cell[0] * self.game.width + cell[1])
+
+    def batch(self, cells):
+        width = self.game.width
+        self.moves.append([i * width + j for i, j in cells])
+
+    def finish(self, won):
+        game = self.game
+        self.record = GameRecord(self.seed, self.index, game.height, game.width,
+                                 game.total_mines, game.mine_bitmap(), self.moves, won)
+
+
+def load_game(record, ai_options=None):
+    """
+    Returns (game, ai) for replaying a GameRecord: a Minesweeper with
+    the recorded layout and a fresh MinesweeperAI for its board.
+    """
+    game = Minesweeper(height=record.height, width=record.width, mines=record.mines)
+    game.load_bitmap(record.layout)
+    ai = MinesweeperAI(height=record.height, width=record.width,
+                       total_mines=record.mines, **(ai_options or {}))
+    return game, ai
+
+
+def play_entry(game, ai, entry, revealed, flags):
+    """
+    Plays one entry of a GameRecord's moves. Returns (lost, number of
+    cells played).
+    """
+    width = game.width
+    if isinstance(entry, list):
+        cells = [divmod(index, width) for index in entry]
+        lost, _ = game.handle_moves(cells, ai, revealed, flags)
+        return lost, len(cells)
+    lost, _ = game.handle_move(divmod(entry, width), ai, revealed, flags)
+    return lost, 1
+
+
+def replay(record, ai_options=None):
+    """
+    Replays a GameRecord: loads its layout into a fresh Minesweeper and
+    plays the recorded moves, with a fresh MinesweeperAI receiving every
+    reveal. Only the AI's knowledge updates run; its move choices are
+    the recorded ones. Returns a ReplayResult.
+    """
+    game, ai = load_game(record, ai_options)
+    revealed = set()
+    flags = set()
+
+    moves = 0
+    lost = False
+    start = time.perf_counter()
+    for entry in record.moves:
+        lost, count = play_entry(game, ai, entry, revealed, flags)
+        moves += count
+        if lost:
+            break
+    seconds = time.perf_counter() - start
+    won = not lost and len(revealed) == record.height * record.width - record.mines
+    return ReplayResult(won, moves, seconds, won == record.won)
+
+
+def replay_file(path, ai_options=None):
+    """
+    Streams every game of a recording file through replay() and returns
+    a summary dictionary.
+    """
+    games = wins = moves = mismatches = 0
+    seconds = 0.0
+    for record in read_records(path):
+        result = replay(record, ai_options)
+        games += 1
+        wins += result.won
+        moves += result.moves
+        seconds += result.seconds
+        mismatches += not result.matches
+    return {
+        "path": path,
+        "games": games,
+        "wins": wins,
+        "moves": moves,
+        "mismatches": mismatches,
+        "elapsed": seconds,
+        "moves_per_sec": moves / seconds if seconds else 0.0,
+    }
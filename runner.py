@@ -1,407 +1,539 @@
-import pygame
-import sys
-import time
-from game import Minesweeper
-from csp import MinesweeperAI
-import os
-
-BASE_DIR = os.path.dirname(__file__)
-# Default difficulty
-HEIGHT = 9
-WIDTH = 9
-MINES = 10
-
-# Colors
-BLACK = (31, 31, 31)
-GRAY = (192, 192, 192)
-WHITE = (255, 255, 255)
-PINK = (255, 192, 203)
-RED = (255, 0, 0)
-GREEN = (0, 255, 0)
-RED_OVERLAY = (255, 0, 0, 128)
-GREEN_OVERLAY = (0, 255, 0, 128)
-# Create game
-pygame.init()
-size = width, height = 1280, 720
-screen = pygame.display.set_mode(size)
-layout_style = "Classic"
-autoplay_start_time = None
-autoplay_total_time = 0
-autoplay_games = 0
-autoplay_wins = 0
-# Fonts
-OPEN_SANS = os.path.join(BASE_DIR, "assets", "fonts", "mine-sweeper.ttf")
-tinyFont = pygame.font.Font(OPEN_SANS, 16)
-smallFont = pygame.font.Font(OPEN_SANS, 20)
-mediumFont = pygame.font.Font(OPEN_SANS, 28)
-largeFont = pygame.font.Font(OPEN_SANS, 40)
-
-# Compute board size
-BOARD_PADDING = 20
-board_width = ((2 / 3) * width) - (BOARD_PADDING * 2)
-board_height = height - (BOARD_PADDING * 2)
-cell_size = int(min(board_width / WIDTH, board_height / HEIGHT))
-board_origin = (BOARD_PADDING, BOARD_PADDING)
-# Load the image once (outside your game loop)
-icon_image = pygame.image.load(os.path.join(BASE_DIR, "assets", "images","flag.png")).convert_alpha()
-icon_image = pygame.transform.scale(icon_image, (50, 50)) 
-# Add images
-flag = pygame.image.load(os.path.join(BASE_DIR, "assets", "images", "flag.png"))
-flag = pygame.transform.scale(flag, (cell_size, cell_size))
-
-mine = pygame.image.load(os.path.join(BASE_DIR, "assets", "images", "mine.png"))
-mine = pygame.transform.scale(mine, (cell_size, cell_size))
-
-mine_red = pygame.image.load(os.path.join(BASE_DIR, "assets", "images", "mine-red.png"))
-mine_red = pygame.transform.scale(mine_red, (cell_size, cell_size))
-
-unrevealed = pygame.image.load(os.path.join(BASE_DIR, "assets", "images", "unrevealed.png"))
-unrevealed = pygame.transform.scale(unrevealed, (cell_size, cell_size))
-# Load number assets
-numbers = []
-for i in range(9):
-    num_path = os.path.join(BASE_DIR, "assets", "images", f"{i}.png")
-    num_img = pygame.image.load(num_path)
-    num_img = pygame.transform.scale(num_img, (cell_size, cell_size))
-    numbers.append(num_img)
-
-# Detonated mine
-mine_detonated = None
-
-# Create game and AI agent
-game = Minesweeper(height=HEIGHT, width=WIDTH, mines=MINES)
-ai = MinesweeperAI(height=HEIGHT, width=WIDTH)
-
-# Keep track of revealed cells, flagged cells, and if a mine was hit
-revealed = set()
-flags = set()
-lost = False
-
-# Show instructions initially
-instructions = True
-
-# Autoplay game
-autoplay = False
-autoplaySpeed = 0.3
-makeAiMove = False
-loop_autoplay = False
-
-# Show Safe and Mine Cells
-showInference = False
-
-while True:
-
-    # Check if game quit
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            sys.exit()
-
-    screen.fill(BLACK)
-
-    # Show game instructions
-    if instructions:
-        # Title
-        title = largeFont.render("Minesweeper", True, WHITE)
-        titleRect = title.get_rect()
-        titleRect.center = ((width / 2), 50)
-        screen.blit(title, titleRect)
-        # Icon
-        icon_rect_right = icon_image.get_rect()
-        icon_rect_right.midleft = (titleRect.right + 20, titleRect.centery)  # 10px gap right side
-        screen.blit(icon_image, icon_rect_right)
-        icon_rect_left = icon_image.get_rect()
-        icon_rect_left.midright = (titleRect.left - 20, titleRect.centery)   # 10px gap left side
-        screen.blit(icon_image, icon_rect_left)
-
-        # Rules
-        rules = [
-            "Left-click to reveal a tile",
-            "The numbers show the nearby mines",  
-            "Right-click to flag a mine",
-            "Reveal all safe tiles to win!"  
-        ]
-        for i, rule in enumerate(rules):
-            line = mediumFont.render(rule, True, WHITE)
-            lineRect = line.get_rect()
-            lineRect.center = ((width / 2), 150 + 50 * i)
-            screen.blit(line, lineRect)
-
-        # Play game button
-        buttonRect = pygame.Rect((width / 4), (3 / 4) * height, width / 2, 50)
-        buttonText = mediumFont.render("Play Game", True, BLACK)
-        buttonTextRect = buttonText.get_rect()
-        buttonTextRect.center = buttonRect.center
-        pygame.draw.rect(screen, WHITE, buttonRect)
-        screen.blit(buttonText, buttonTextRect)
-
-        # Check if play button clicked
-        click, _, _ = pygame.mouse.get_pressed()
-        if click == 1:
-            mouse = pygame.mouse.get_pos()
-            if buttonRect.collidepoint(mouse):
-                instructions = False
-                time.sleep(0.3)
-
-        pygame.display.flip()
-        continue
-
-    # Draw board
-    cells = []
-    for i in range(HEIGHT):
-        row = []
-        for j in range(WIDTH):
-
-            # Draw rectangle for cell
-            rect = pygame.Rect(
-                board_origin[0] + j * cell_size,
-                board_origin[1] + i * cell_size,
-                cell_size, cell_size
-            )
-            if (i, j) not in revealed and (i, j) not in flags:
-                screen.blit(unrevealed, rect)
-                # Show inference overlay if enabled
-                if showInference:
-                    overlay = pygame.Surface((cell_size, cell_size), pygame.SRCALPHA)
-                    if (i, j) in ai.safes:
-                        overlay.fill(GREEN_OVERLAY)
-                        screen.blit(overlay, rect)
-                    elif (i, j) in ai.mines:
-                        overlay.fill(RED_OVERLAY)
-                        screen.blit(overlay, rect)
-            else:
-                pygame.draw.rect(screen, GRAY, rect)
-                pygame.draw.rect(screen, BLACK, rect, 1)
-
-            # Add a mine, flag, or number if needed
-            if game.is_mine((i, j)) and lost:
-                if (i,j) == mine_detonated:
-                    screen.blit(mine_red, rect)
-                else:
-                    screen.blit(mine, rect)
-            elif (i, j) in flags:
-                screen.blit(flag, rect)
-            elif (i, j) in revealed:
-                mine_count = game.nearby_mines((i, j))
-                screen.blit(numbers[mine_count], rect)
-            row.append(rect)
-        cells.append(row)
-
-    # Autoplay Button
-    autoplayBtn = pygame.Rect(
-        (2 / 3) * width + BOARD_PADDING, BOARD_PADDING,
-        (width / 3) - BOARD_PADDING * 2, 50
-    )
-    bText = "Autoplay" if not autoplay else "Stop"
-    buttonText = mediumFont.render(bText, True, BLACK)
-    buttonRect = buttonText.get_rect()
-    buttonRect.center = autoplayBtn.center
-    pygame.draw.rect(screen, WHITE, autoplayBtn)
-    screen.blit(buttonText, buttonRect)
-
-    # AI Move button
-    aiButton = pygame.Rect(
-        (2 / 3) * width + BOARD_PADDING, BOARD_PADDING + 70,
-        (width / 3) - BOARD_PADDING * 2, 50
-    )
-    buttonText = mediumFont.render("AI Move", True, BLACK)
-    buttonRect = buttonText.get_rect()
-    buttonRect.center = aiButton.center
-    if not autoplay:
-        pygame.draw.rect(screen, WHITE, aiButton)
-        screen.blit(buttonText, buttonRect)
-
-    # Reset button
-    resetButton = pygame.Rect(
-        (2 / 3) * width + BOARD_PADDING, BOARD_PADDING + 140,
-        (width / 3) - BOARD_PADDING * 2, 50
-    )
-    buttonText = mediumFont.render("Reset", True, BLACK)
-    buttonRect = buttonText.get_rect()
-    buttonRect.center = resetButton.center
-    if not autoplay:
-        pygame.draw.rect(screen, WHITE, resetButton)
-        screen.blit(buttonText, buttonRect)
-
-    # Display text
-    text = ""
-    if lost:
-        text = "You Lose :("
-    elif game.mines_initialized and len(revealed) == (HEIGHT * WIDTH - MINES):
-        text = "You Win :D"
-    text = mediumFont.render(text, True, WHITE)
-    textRect = text.get_rect()
-    textRect.center = ((5 / 6) * width, BOARD_PADDING + 235)
-    screen.blit(text, textRect)
-
-    # Show Safes and Mines button
-    safesMinesButton = pygame.Rect(
-        (2 / 3) * width + BOARD_PADDING, BOARD_PADDING + 280,
-        (width / 3) - BOARD_PADDING * 2, 50
-    )
-    bText = "Show Inference" if not showInference else "Hide Inference"
-    buttonText = smallFont.render(bText, True, BLACK)
-    buttonRect = buttonText.get_rect()
-    buttonRect.center = safesMinesButton.center
-    if not autoplay:
-        pygame.draw.rect(screen, WHITE, safesMinesButton)
-        screen.blit(buttonText, buttonRect)
-        
-    # Loop Autoplay Button
-    loopAutoplayBtn = pygame.Rect(
-        (2 / 3) * width + BOARD_PADDING, BOARD_PADDING + 350,
-        (width / 3) - BOARD_PADDING * 2, 50
-    )
-    buttonText = smallFont.render("Loop Autoplay", True, BLACK)
-    buttonRect = buttonText.get_rect()
-    buttonRect.center = loopAutoplayBtn.center
-    if not autoplay:
-        pygame.draw.rect(screen, WHITE, loopAutoplayBtn)
-        screen.blit(buttonText, buttonRect)
-
-    # Display autoplay statistics
-    if autoplay_games > 0:
-        avg_speed = autoplay_total_time / autoplay_games
-        win_rate = (autoplay_wins / autoplay_games) * 100
-        games_text = tinyFont.render(
-        f"Games Played: {autoplay_games}", True, WHITE
-        )
-        avg_speed_text = tinyFont.render(
-            f"Avg Speed: {avg_speed:.2f} sec", True, WHITE
-        )
-        win_rate_text = tinyFont.render(
-            f"Win Rate: {win_rate:.1f}%", True, WHITE
-        )
-        screen.blit(games_text, ((2 / 3) * width + BOARD_PADDING, BOARD_PADDING + 590))
-        screen.blit(avg_speed_text, ((2 / 3) * width + BOARD_PADDING, BOARD_PADDING + 620))
-        screen.blit(win_rate_text, ((2 / 3) * width + BOARD_PADDING, BOARD_PADDING + 650))
-
-    move = None
-
-    left, _, right = pygame.mouse.get_pressed()
-
-    # Check for a right-click to toggle flagging
-    if right == 1 and not lost and not autoplay:
-        mouse = pygame.mouse.get_pos()
-        for i in range(HEIGHT):
-            for j in range(WIDTH):
-                if cells[i][j].collidepoint(mouse) and (i, j) not in revealed:
-                    if (i, j) in flags:
-                        flags.remove((i, j))
-                    else:
-                        flags.add((i, j))
-                    time.sleep(0.2)
-
-    elif left == 1:
-        mouse = pygame.mouse.get_pos()
-
-        # If Autoplay button clicked, toggle autoplay
-        if autoplayBtn.collidepoint(mouse):
-            if not lost:
-                if not autoplay:  # Starting autoplay
-                    autoplay_start_time = time.time()
-                else:  # Stopping autoplay manually
-                    autoplay_total_time += time.time() - autoplay_start_time
-                    autoplay_start_time = None
-                    loop_autoplay = False  # Also stop loop mode
-                autoplay = not autoplay
-            else:
-                autoplay = False
-                loop_autoplay = False
-            time.sleep(0.2)
-            continue
-        
-        # Loop Autoplay button click
-        if loopAutoplayBtn.collidepoint(mouse):
-            if not lost:
-                loop_autoplay = not loop_autoplay
-                autoplay = loop_autoplay  # if loop starts, autoplay starts
-                if loop_autoplay:
-                    autoplay_start_time = time.time()
-            else:
-                loop_autoplay = False
-                autoplay = False
-            time.sleep(0.2)
-            continue
-
-        # If AI button clicked, make an AI move
-        elif aiButton.collidepoint(mouse) and not lost:
-            makeAiMove = True
-            time.sleep(0.2)
-
-        # Reset game state
-        elif resetButton.collidepoint(mouse):
-            game = Minesweeper(height=HEIGHT, width=WIDTH, mines=MINES)
-            ai = MinesweeperAI(height=HEIGHT, width=WIDTH)
-            revealed = set()
-            flags = set()
-            lost = False
-            mine_detonated = None
-            autoplay_games = 0
-            autoplay_wins = 0
-            autoplay_total_time = 0
-            autoplay_start_time = None
-            continue
-
-        # If Inference button clicked, toggle showInference
-        elif safesMinesButton.collidepoint(mouse):
-            showInference = not showInference
-            time.sleep(0.2)
-
-        # User-made move
-        elif not lost:
-            for i in range(HEIGHT):
-                for j in range(WIDTH):
-                    if (cells[i][j].collidepoint(mouse)
-                            and (i, j) not in flags
-                            and (i, j) not in revealed):
-                        move = (i, j)
-
-    # If autoplay, make move with AI
-    if autoplay or makeAiMove:
-        if makeAiMove:
-            makeAiMove = False
-        move = ai.make_safe_move()
-        if move is None:
-            move = ai.make_random_move()
-            if move is None:
-                flags = ai.mines.copy()
-                print("No moves left to make.")
-                autoplay = False
-            else:
-                print("No known safe moves, AI making random move.")
-        else:
-            print("AI making safe move.")
-
-        # Add delay for autoplay
-        if autoplay:
-            time.sleep(autoplaySpeed)
-
-    if move:
-        lost, mine_detonated_move = game.handle_move(move, ai, revealed, flags)
-        if lost or (game.mines_initialized and len(revealed) == (HEIGHT * WIDTH - MINES)):
-            if autoplay or loop_autoplay:
-                autoplay_games += 1
-                if not lost:
-                    autoplay_wins += 1
-                if autoplay_start_time:
-                    autoplay_total_time += time.time() - autoplay_start_time
-                    autoplay_start_time = None
-
-            if lost:
-                lost = True
-                mine_detonated = mine_detonated_move
-
-            if loop_autoplay:
-                # Reset for next looped game WITHOUT counting again
-                game = Minesweeper(height=HEIGHT, width=WIDTH, mines=MINES)
-                ai = MinesweeperAI(height=HEIGHT, width=WIDTH)
-                revealed.clear()
-                flags.clear()
-                lost = False
-                mine_detonated = None
-                autoplay_start_time = time.time()
-                autoplay = True
-            else:
-                autoplay = False
-            
-    pygame.display.flip()
+import pygame
+import sys
+import time
+from game import Minesweeper
+from csp import MinesweeperAI
+import os
+
+BASE_DIR = os.path.dirname(__file__)
+# Default difficulty
+HEIGHT = 9
+WIDTH = 9
+MINES = 10
+
+# Colors
+BLACK = (31, 31, 31)
+GRAY = (192, 192, 192)
+WHITE = (255, 255, 255)
+PINK = (255, 192, 203)
+RED = (255, 0, 0)
+GREEN = (0, 255, 0)
+RED_OVERLAY = (255, 0, 0, 128)
+GREEN_OVERLAY = (0, 255, 0, 128)
+# Create game
+pygame.init()
+size = width, height = 1280, 720
+screen = pygame.display.set_mode(size)
+layout_style = "Classic"
+autoplay_start_time = None
+autoplay_total_time = 0
+autoplay_games = 0
+autoplay_wins = 0
+# Fonts
+OPEN_SANS = os.path.join(BASE_DIR, "assets", "fonts", "mine-sweeper.ttf")
+tinyFont = pygame.font.Font(OPEN_SANS, 16)
+smallFont = pygame.font.Font(OPEN_SANS, 20)
+mediumFont = pygame.font.Font(OPEN_SANS, 28)
+largeFont = pygame.font.Font(OPEN_SANS, 40)
+
+# Compute board size
+BOARD_PADDING = 20
+board_width = ((2 / 3) * width) - (BOARD_PADDING * 2)
+board_height = height - (BOARD_PADDING * 2)
+board_origin = (BOARD_PADDING, BOARD_PADDING)
+
+
+class SpriteAtlas():
+    """
+    All board tiles for one cell size, scaled once and packed side by
+    side into a single surface. The inference overlays are composited
+    onto the unrevealed tile ahead of time, so drawing a cell is at most
+    two blits and never allocates a Surface.
+
+    Atlases are cached per size; use SpriteAtlas.for_size(size).
+    """
+
+    IMAGES = ["flag", "mine", "mine-red", "unrevealed"] + [str(i) for i in range(9)]
+
+    sources = {}
+    cache = {}
+
+    @classmethod
+    def for_size(cls, size):
+        atlas = cls.cache.get(size)
+        if atlas is None:
+            atlas = cls.cache[size] = cls(size)
+        return atlas
+
+    @classmethod
+    def source(cls, name):
+        # Ảnh gốc chỉ đọc từ đĩa một lần, dùng chung cho mọi kích thước
+        image = cls.sources.get(name)
+        if image is None:
+            path = os.path.join(BASE_DIR, "assets", "images", f"{name}.png")
+            image = cls.sources[name] = pygame.image.load(path).convert_alpha()
+        return image
+
+    def __init__(self, size):
+        self.size = size
+        names = self.IMAGES + ["open", "safe", "mine-overlay"]
+        self.surface = pygame.Surface((size * len(names), size), pygame.SRCALPHA)
+        self.tiles = {}
+        unrevealed = pygame.transform.scale(self.source("unrevealed"), (size, size))
+        for index, name in enumerate(names):
+            rect = pygame.Rect(index * size, 0, size, size)
+            if name in self.IMAGES:
+                # Chép nguyên điểm ảnh (kể cả alpha) vào nền trong suốt
+                image = pygame.transform.scale(self.source(name), (size, size))
+                self.surface.blit(image, rect, special_flags=pygame.BLEND_RGBA_MAX)
+            elif name == "open":
+                pygame.draw.rect(self.surface, GRAY, rect)
+                pygame.draw.rect(self.surface, BLACK, rect, 1)
+            else:
+                overlay = pygame.Surface((size, size), pygame.SRCALPHA)
+                overlay.fill(GREEN_OVERLAY if name == "safe" else RED_OVERLAY)
+                self.surface.blit(unrevealed, rect, special_flags=pygame.BLEND_RGBA_MAX)
+                self.surface.blit(overlay, rect)
+            self.tiles[name] = self.surface.subsurface(rect)
+
+    def __getitem__(self, name):
+        return self.tiles[name]
+
+
+def board_cell_size(rows, cols):
+    return int(min(board_width / cols, board_height / rows))
+
+
+cell_size = board_cell_size(HEIGHT, WIDTH)
+sprites = SpriteAtlas.for_size(cell_size)
+icon_image = SpriteAtlas.for_size(50)["flag"]
+
+# Detonated mine
+mine_detonated = None
+
+# Create game and AI agent
+game = Minesweeper(height=HEIGHT, width=WIDTH, mines=MINES)
+ai = MinesweeperAI(height=HEIGHT, width=WIDTH, total_mines=MINES)
+
+# Keep track of revealed cells, flagged cells, and if a mine was hit
+revealed = set()
+flags = set()
+lost = False
+
+# Show instructions initially
+instructions = True
+
+# Autoplay game. autoplaySpeed is the delay between autoplay moves in
+# seconds; 0 plays as many moves as fit in a frame.
+autoplay = False
+autoplaySpeed = 0.3
+loop_autoplay = False
+next_autoplay_move = 0
+
+# Frame pacing
+FPS = 60
+FRAME_MS = 1000 // FPS
+clock = pygame.time.Clock()
+
+# Show Safe and Mine Cells
+showInference = False
+
+# Buttons
+PANEL_X = (2 / 3) * width + BOARD_PADDING
+PANEL_BUTTON_WIDTH = (width / 3) - BOARD_PADDING * 2
+autoplayBtn = pygame.Rect(PANEL_X, BOARD_PADDING, PANEL_BUTTON_WIDTH, 50)
+aiButton = pygame.Rect(PANEL_X, BOARD_PADDING + 70, PANEL_BUTTON_WIDTH, 50)
+resetButton = pygame.Rect(PANEL_X, BOARD_PADDING + 140, PANEL_BUTTON_WIDTH, 50)
+safesMinesButton = pygame.Rect(PANEL_X, BOARD_PADDING + 280, PANEL_BUTTON_WIDTH, 50)
+loopAutoplayBtn = pygame.Rect(PANEL_X, BOARD_PADDING + 350, PANEL_BUTTON_WIDTH, 50)
+playButton = pygame.Rect((width / 4), (3 / 4) * height, width / 2, 50)
+panel_rect = pygame.Rect((2 / 3) * width, 0, width - (2 / 3) * width, height)
+
+# The board is drawn into board_surface, one cell at a time. drawn maps
+# each cell to the state it was last drawn in, so a frame only redraws
+# the cells whose state changed and only those rects are sent to the
+# display. Whatever changes the board (a move, a flag, the inference
+# toggle, a new game) sets board_dirty so the next frame rescans it.
+board_surface = pygame.Surface((WIDTH * cell_size, HEIGHT * cell_size))
+board_rect = board_surface.get_rect(topleft=board_origin)
+drawn = {}
+BASE_TILES = {"open": "open", "unrevealed": "unrevealed", "safe": "safe", "mine": "mine-overlay"}
+TOP_TILES = {"flag": "flag", "mine": "mine", "mine_red": "mine-red"}
+board_dirty = True
+panel_signature = None
+full_redraw = True
+
+
+def cell_state(cell):
+    """
+    Returns (base, top) describing how cell looks right now: base is
+    "open", "unrevealed", "safe" or "mine" (the last two are inference
+    overlays), top is None, "flag", "number", "mine" or "mine_red".
+    """
+    if cell in revealed or cell in flags:
+        base = "open"
+    elif showInference and cell in ai.safes:
+        base = "safe"
+    elif showInference and cell in ai.mines:
+        base = "mine"
+    else:
+        base = "unrevealed"
+
+    if lost and game.is_mine(cell):
+        top = "mine_red" if cell == mine_detonated else "mine"
+    elif cell in flags:
+        top = "flag"
+    elif cell in revealed:
+        top = "number"
+    else:
+        top = None
+    return base, top
+
+
+def draw_cell(cell, state):
+    i, j = cell
+    rect = pygame.Rect(j * cell_size, i * cell_size, cell_size, cell_size)
+    base, top = state
+    # Lớp phủ suy luận đã được ghép sẵn vào ô trong atlas
+    board_surface.blit(sprites[BASE_TILES[base]], rect)
+    if top == "number":
+        board_surface.blit(sprites[str(game.nearby_mines(cell))], rect)
+    elif top is not None:
+        board_surface.blit(sprites[TOP_TILES[top]], rect)
+    return rect
+
+
+def update_board():
+    """
+    Redraws the cells that changed since the last call and copies them
+    to the screen. Returns the screen rects that were touched.
+    """
+    dirty = []
+    for i in range(HEIGHT):
+        for j in range(WIDTH):
+            state = cell_state((i, j))
+            if drawn.get((i, j)) != state:
+                drawn[(i, j)] = state
+                dirty.append(draw_cell((i, j), state))
+
+    # Nhiều ô đổi cùng lúc thì chép cả bàn cờ một lần
+    if len(dirty) > 64:
+        screen.blit(board_surface, board_rect)
+        return [board_rect]
+    rects = []
+    for rect in dirty:
+        screen_rect = rect.move(board_origin)
+        screen.blit(board_surface, screen_rect, rect)
+        rects.append(screen_rect)
+    return rects
+
+
+def draw_button(rect, label, font):
+    buttonText = font.render(label, True, BLACK)
+    buttonRect = buttonText.get_rect()
+    buttonRect.center = rect.center
+    pygame.draw.rect(screen, WHITE, rect)
+    screen.blit(buttonText, buttonRect)
+
+
+def draw_panel(text):
+    screen.fill(BLACK, panel_rect)
+
+    # Autoplay Button
+    draw_button(autoplayBtn, "Autoplay" if not autoplay else "Stop", mediumFont)
+    if not autoplay:
+        draw_button(aiButton, "AI Move", mediumFont)
+        draw_button(resetButton, "Reset", mediumFont)
+
+    # Display text
+    text = mediumFont.render(text, True, WHITE)
+    textRect = text.get_rect()
+    textRect.center = ((5 / 6) * width, BOARD_PADDING + 235)
+    screen.blit(text, textRect)
+
+    if not autoplay:
+        bText = "Show Inference" if not showInference else "Hide Inference"
+        draw_button(safesMinesButton, bText, smallFont)
+        draw_button(loopAutoplayBtn, "Loop Autoplay", smallFont)
+
+    # Display autoplay statistics
+    if autoplay_games > 0:
+        avg_speed = autoplay_total_time / autoplay_games
+        win_rate = (autoplay_wins / autoplay_games) * 100
+        games_text = tinyFont.render(
+        f"Games Played: {autoplay_games}", True, WHITE
+        )
+        avg_speed_text = tinyFont.render(
+            f"Avg Speed: {avg_speed:.2f} sec", True, WHITE
+        )
+        win_rate_text = tinyFont.render(
+            f"Win Rate: {win_rate:.1f}%", True, WHITE
+        )
+        screen.blit(games_text, (PANEL_X, BOARD_PADDING + 590))
+        screen.blit(avg_speed_text, (PANEL_X, BOARD_PADDING + 620))
+        screen.blit(win_rate_text, (PANEL_X, BOARD_PADDING + 650))
+
+
+def cell_at(pos):
+    """
+    Returns the board cell under the screen position pos, or None.
+    """
+    if not board_rect.collidepoint(pos):
+        return None
+    return ((pos[1] - board_origin[1]) // cell_size,
+            (pos[0] - board_origin[0]) // cell_size)
+
+
+def draw_instructions():
+    screen.fill(BLACK)
+
+    # Title
+    title = largeFont.render("Minesweeper", True, WHITE)
+    titleRect = title.get_rect()
+    titleRect.center = ((width / 2), 50)
+    screen.blit(title, titleRect)
+    # Icon
+    icon_rect_right = icon_image.get_rect()
+    icon_rect_right.midleft = (titleRect.right + 20, titleRect.centery)  # 10px gap right side
+    screen.blit(icon_image, icon_rect_right)
+    icon_rect_left = icon_image.get_rect()
+    icon_rect_left.midright = (titleRect.left - 20, titleRect.centery)   # 10px gap left side
+    screen.blit(icon_image, icon_rect_left)
+
+    # Rules
+    rules = [
+        "Left-click to reveal a tile",
+        "The numbers show the nearby mines",  
+        "Right-click to flag a mine",
+        "Reveal all safe tiles to win!"  
+    ]
+    for i, rule in enumerate(rules):
+        line = mediumFont.render(rule, True, WHITE)
+        lineRect = line.get_rect()
+        lineRect.center = ((width / 2), 150 + 50 * i)
+        screen.blit(line, lineRect)
+
+    # Play game button
+    draw_button(playButton, "Play Game", mediumFont)
+
+
+def new_game():
+    global game, ai, lost, mine_detonated, board_dirty
+    game = Minesweeper(height=HEIGHT, width=WIDTH, mines=MINES)
+    ai = MinesweeperAI(height=HEIGHT, width=WIDTH, total_mines=MINES)
+    revealed.clear()
+    flags.clear()
+    drawn.clear()
+    lost = False
+    mine_detonated = None
+    board_dirty = True
+
+
+def ai_turn(single=False):
+    """
+    Chooses the AI's next move. With single=False (autoplay) every known
+    safe cell is returned at once. Returns (move, moves).
+    """
+    global flags, autoplay, board_dirty
+    move = None
+    moves = None
+    # Autoplay mở tất cả ô an toàn đã biết trong một lượt
+    if not single:
+        moves = ai.pop_safe_moves()
+    if moves:
+        print(f"AI making {len(moves)} safe moves.")
+    else:
+        move = ai.make_safe_move()
+        if move is None:
+            move = ai.make_random_move()
+            if move is None:
+                flags = ai.mines.copy()
+                board_dirty = True
+                print("No moves left to make.")
+                autoplay = False
+            else:
+                print("No known safe moves, AI guessing.")
+        else:
+            print("AI making safe move.")
+    return move, moves
+
+
+def play(move, moves):
+    """
+    Plays a move or a batch of moves and handles the end of the game.
+    """
+    global lost, mine_detonated, autoplay, autoplay_games, autoplay_wins
+    global autoplay_total_time, autoplay_start_time, board_dirty
+    if moves:
+        lost, mine_detonated_move = game.handle_moves(moves, ai, revealed, flags)
+    elif move:
+        lost, mine_detonated_move = game.handle_move(move, ai, revealed, flags)
+    else:
+        return
+    board_dirty = True
+    if lost or (game.mines_initialized and len(revealed) == (HEIGHT * WIDTH - MINES)):
+        if autoplay or loop_autoplay:
+            autoplay_games += 1
+            if not lost:
+                autoplay_wins += 1
+            if autoplay_start_time:
+                autoplay_total_time += time.time() - autoplay_start_time
+                autoplay_start_time = None
+
+        if lost:
+            mine_detonated = mine_detonated_move
+
+        if loop_autoplay:
+            # Reset for next looped game WITHOUT counting again
+            new_game()
+            autoplay_start_time = time.time()
+            autoplay = True
+        else:
+            autoplay = False
+
+
+def handle_click(pos, button):
+    global instructions, full_redraw, autoplay, loop_autoplay, showInference
+    global autoplay_start_time, autoplay_total_time, autoplay_games, autoplay_wins
+    global next_autoplay_move, board_dirty
+    was_autoplay = autoplay
+
+    if instructions:
+        if button == 1 and playButton.collidepoint(pos):
+            instructions = False
+            full_redraw = True
+        return
+
+    # Right-click to toggle flagging
+    if button == 3:
+        cell = cell_at(pos)
+        if cell is not None and not lost and not autoplay and cell not in revealed:
+            if cell in flags:
+                flags.remove(cell)
+            else:
+                flags.add(cell)
+            board_dirty = True
+        return
+    if button != 1:
+        return
+
+    # If Autoplay button clicked, toggle autoplay
+    if autoplayBtn.collidepoint(pos):
+        if not lost:
+            if not autoplay:  # Starting autoplay
+                autoplay_start_time = time.time()
+            else:  # Stopping autoplay manually
+                autoplay_total_time += time.time() - autoplay_start_time
+                autoplay_start_time = None
+                loop_autoplay = False  # Also stop loop mode
+            autoplay = not autoplay
+        else:
+            autoplay = False
+            loop_autoplay = False
+
+    # Loop Autoplay button click
+    elif loopAutoplayBtn.collidepoint(pos):
+        if not lost:
+            loop_autoplay = not loop_autoplay
+            autoplay = loop_autoplay  # if loop starts, autoplay starts
+            if loop_autoplay:
+                autoplay_start_time = time.time()
+        else:
+            loop_autoplay = False
+            autoplay = False
+
+    # If AI button clicked, make an AI move
+    elif aiButton.collidepoint(pos):
+        if not lost:
+            play(*ai_turn(single=True))
+
+    # Reset game state
+    elif resetButton.collidepoint(pos):
+        new_game()
+        autoplay_games = 0
+        autoplay_wins = 0
+        autoplay_total_time = 0
+        autoplay_start_time = None
+
+    # If Inference button clicked, toggle showInference
+    elif safesMinesButton.collidepoint(pos):
+        showInference = not showInference
+        board_dirty = True
+
+    # User-made move
+    elif not lost:
+        cell = cell_at(pos)
+        if cell is not None and cell not in flags and cell not in revealed:
+            play(cell, None)
+
+    if autoplay and not was_autoplay:
+        next_autoplay_move = pygame.time.get_ticks()
+
+
+while True:
+
+    # Draw whatever changed since the last frame
+    if instructions:
+        if full_redraw:
+            draw_instructions()
+            pygame.display.flip()
+            full_redraw = False
+    else:
+        dirty_rects = []
+        if full_redraw:
+            screen.fill(BLACK)
+            drawn.clear()
+            board_dirty = True
+            panel_signature = None
+            dirty_rects.append(screen.get_rect())
+            full_redraw = False
+
+        # Chỉ duyệt bàn cờ khi có thao tác làm nó thay đổi
+        if board_dirty:
+            board_dirty = False
+            dirty_rects.extend(update_board())
+
+        text = ""
+        if lost:
+            text = "You Lose :("
+        elif game.mines_initialized and len(revealed) == (HEIGHT * WIDTH - MINES):
+            text = "You Win :D"
+        signature = (text, autoplay, showInference, autoplay_games, autoplay_wins,
+                     autoplay_total_time)
+        if signature != panel_signature:
+            panel_signature = signature
+            draw_panel(text)
+            dirty_rects.append(panel_rect)
+
+        if dirty_rects:
+            pygame.display.update(dirty_rects)
+
+    clock.tick(FPS)
+
+    # Không có việc gì thì ngủ đến khi có sự kiện hoặc đến nước autoplay kế tiếp
+    if not autoplay:
+        events = [pygame.event.wait()]
+    else:
+        delay = next_autoplay_move - pygame.time.get_ticks()
+        events = [pygame.event.wait(delay)] if delay > 0 else []
+    events.extend(pygame.event.get())
+
+    for event in events:
+        if event.type == pygame.QUIT:
+            sys.exit()
+        elif event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+            full_redraw = True
+        elif event.type == pygame.MOUSEBUTTONDOWN:
+            handle_click(event.pos, event.button)
+
+    # Autoplay: play the moves that are due, but leave time to draw a frame
+    now = pygame.time.get_ticks()
+    frame_deadline = now + FRAME_MS
+    autoplay_delay = int(autoplaySpeed * 1000)
+    while autoplay and next_autoplay_move <= now < frame_deadline:
+        play(*ai_turn())
+        if next_autoplay_move + autoplay_delay > now:
+            next_autoplay_move += autoplay_delay
+        else:
+            next_autoplay_move = now + autoplay_delay
+        now = pygame.time.get_ticks()
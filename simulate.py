@@ -0,0 +1,391 @@
+"""
+Headless batch simulation: plays many AI games without pygame and
+reports win rate and throughput.
+
+Usage:
+    python simulate.py --games 10000 --height 16 --width 16 --mines 40
+    python simulate.py --games 100000 --workers 8 --seed 42
+
+Every game gets its own random.Random seeded from (seed, game index), so
+a run with a given seed plays exactly the same games no matter how many
+worker processes it is split across.
+"""
+import argparse
+import json
+import os
+import random
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+from game import Minesweeper, ArrayMinesweeper, ChunkedMinesweeper, MIN_UNBOUNDED_DENSITY
+from csp import GUESS_STRATEGIES, MinesweeperAI
+from patterns import PatternTable
+from stats import SolverStats, percentile
+from recording import GameRecorder, RecordWriter, replay_file
+
+GameResult = namedtuple("GameResult", ["won", "moves", "seconds"])
+
+
+def game_rng(seed, index):
+    """
+    Returns the random source for game number `index` of a run.
+    String seeds are hashed with SHA-512, so the result does not depend
+    on the process or on PYTHONHASHSEED.
+    """
+    return random.Random(f"{seed}:{index}")
+
+
+def play_game(height=8, width=8, mines=8, rng=None, array=False, ai_options=None,
+              stats=None, recorder=None):
+    """
+    Plays one full game with MinesweeperAI and returns a GameResult.
+    The AI reveals all the safe cells it knows in one batch, and
+    guesses when it knows none.
+    Mine placement and random moves share `rng`. With array=True the
+    board is an ArrayMinesweeper and revealed/flags live in its arrays.
+    ai_options are extra keyword arguments for MinesweeperAI.
+    With a stats.SolverStats the AI is instrumented, the latency of
+    every move is recorded and its counters are added to it. A
+    recording.GameRecorder receives every move.
+    """
+    if array:
+        game = ArrayMinesweeper(height=height, width=width, mines=mines, rng=rng)
+        revealed = game.revealed
+        flags = game.flags
+    else:
+        game = Minesweeper(height=height, width=width, mines=mines, rng=rng)
+        revealed = set()
+        flags = set()
+    ai = MinesweeperAI(height=height, width=width, rng=rng, total_mines=mines,
+                       **(ai_options or {}))
+    if stats is not None:
+        stats.attach(ai)
+    if recorder is not None:
+        recorder.begin(game)
+    target = height * width - mines
+
+    moves = 0
+    won = False
+    start = time.perf_counter()
+    while True:
+        turn = time.perf_counter()
+        # Mở mọi ô an toàn đã biết trong một lượt, chỉ đoán khi hết
+        safe = ai.pop_safe_moves()
+        if safe:
+            if recorder is not None:
+                recorder.batch(safe)
+            lost, _ = game.handle_moves(safe, ai, revealed, flags)
+            moves += len(safe)
+        else:
+            move = ai.make_random_move()
+            if move is None:
+                break
+            if recorder is not None:
+                recorder.move(move)
+            lost, _ = game.handle_move(move, ai, revealed, flags)
+            moves += 1
+        if stats is not None:
+            stats.record_move(time.perf_counter() - turn)
+        if lost:
+            break
+        if len(revealed) == target:
+            won = True
+            break
+    seconds = time.perf_counter() - start
+    if stats is not None:
+        stats.finish(ai)
+    if recorder is not None:
+        recorder.finish(won)
+    return GameResult(won, moves, seconds)
+
+
+# PatternTable per file path, loaded once per process
+pattern_tables = {}
+
+
+def load_patterns(path):
+    if path not in pattern_tables:
+        pattern_tables[path] = PatternTable.from_file(path)
+    return pattern_tables[path]
+
+
+def play_range(start, stop, seed, height, width, mines, array=False, ai_options=None,
+               patterns=None, stats=None, record=None, record_lost=False):
+    """
+    Plays games number start..stop-1 of a seeded run.
+    Module-level so it can be sent to worker processes.
+    With a patterns file path, all games of the process share one
+    PatternTable warm-loaded from that file.
+    With a recording.RecordWriter every game, or only the lost ones
+    with record_lost=True, is written to it.
+    """
+    if patterns is not None:
+        ai_options = dict(ai_options or {}, patterns=load_patterns(patterns))
+    results = []
+    for index in range(start, stop):
+        recorder = GameRecorder(seed, index) if record is not None else None
+        result = play_game(height, width, mines, game_rng(seed, index), array, ai_options,
+                           stats, recorder)
+        if recorder is not None and not (record_lost and result.won):
+            record.write(recorder.record)
+        results.append(result)
+    return results
+
+
+def play_range_stats(*args):
+    """
+    play_range for worker processes that also collects solver stats;
+    returns (results, SolverStats).
+    """
+    stats = SolverStats()
+    return play_range(*args, stats=stats), stats
+
+
+def summarize(results, elapsed, height, width, mines, seed=None, workers=1):
+    """
+    Builds the report dictionary for a list of GameResult
+    given in game index order.
+    """
+    games = len(results)
+    wins = sum(1 for r in results if r.won)
+    moves = sum(r.moves for r in results)
+    latencies = sorted(r.seconds for r in results)
+    return {
+        "height": height,
+        "width": width,
+        "mines": mines,
+        "seed": seed,
+        "workers": workers,
+        "games": games,
+        "wins": wins,
+        "win_rate": wins / games if games else 0.0,
+        "moves": moves,
+        "elapsed": elapsed,
+        "games_per_sec": games / elapsed if elapsed else 0.0,
+        "moves_per_sec": moves / elapsed if elapsed else 0.0,
+        "latency": {
+            "mean": sum(latencies) / games if games else 0.0,
+            "p50": percentile(latencies, 50),
+            "p90": percentile(latencies, 90),
+            "p99": percentile(latencies, 99),
+            "max": latencies[-1] if latencies else 0.0,
+        },
+    }
+
+
+def simulate(games, height=8, width=8, mines=8, seed=None, workers=1, chunk_size=None,
+             array=False, ai_options=None, patterns=None, stats=None, record=None,
+             record_lost=False):
+    """
+    Plays `games` games and returns the summary report.
+    With workers > 1 the games are split into chunks of consecutive
+    indices and played in a process pool; results are merged back in
+    index order, so wins and move counts match a single-process run
+    with the same seed. A seed is drawn and reported when none is given.
+    patterns is an optional pattern-table file: it is warm-loaded by
+    every process, and saved back with the new patterns after
+    single-process runs.
+    With a stats.SolverStats every AI is instrumented and the data of
+    all processes is merged into it. Games are written to record (a
+    recording.RecordWriter) in single-process runs only.
+    """
+    if seed is None:
+        seed = random.SystemRandom().randrange(2 ** 32)
+    if workers is None or workers < 1:
+        workers = os.cpu_count() or 1
+
+    if record is not None and workers != 1:
+        raise ValueError("games can only be recorded with a single worker")
+
+    start = time.perf_counter()
+    if workers == 1:
+        results = play_range(0, games, seed, height, width, mines, array, ai_options,
+                             patterns, stats, record, record_lost)
+        if patterns is not None:
+            load_patterns(patterns).save(patterns)
+    else:
+        if chunk_size is None:
+            # A few chunks per worker keeps the pool busy when game
+            # lengths vary, without paying pickling costs per game
+            chunk_size = max(1, games // (workers * 4))
+        bounds = [(i, min(i + chunk_size, games)) for i in range(0, games, chunk_size)]
+        results = []
+        task = play_range if stats is None else play_range_stats
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(task, lo, hi, seed, height, width, mines,
+                            array, ai_options, patterns)
+                for lo, hi in bounds
+            ]
+            for future in futures:
+                if stats is None:
+                    results.extend(future.result())
+                else:
+                    chunk, chunk_stats = future.result()
+                    results.extend(chunk)
+                    stats.merge(chunk_stats)
+    elapsed = time.perf_counter() - start
+    return summarize(results, elapsed, height, width, mines, seed, workers)
+
+
+def explore(max_moves, density=0.2, seed=None, height=None, width=None, chunk_size=32,
+            ai_options=None):
+    """
+    Stress test for long explorations: plays one game on a lazily
+    generated ChunkedMinesweeper (unbounded unless height and width are
+    given) with a sparse MinesweeperAI, starting in the middle of the
+    board, until max_moves moves are made, a mine is hit or no move is
+    left. Returns a report dictionary.
+    """
+    if seed is None:
+        seed = random.SystemRandom().randrange(2 ** 32)
+    game = ChunkedMinesweeper(height, width, density, seed, chunk_size)
+    ai = MinesweeperAI(height=game.height, width=game.width, rng=game_rng(seed, 0),
+                       sparse=True, **(ai_options or {}))
+    revealed = set()
+    flags = set()
+
+    moves = 0
+    lost = False
+    start = time.perf_counter()
+    move = (game.height // 2, game.width // 2)
+    lost, _ = game.handle_move(move, ai, revealed, flags)
+    moves += 1
+    while not lost and moves < max_moves:
+        safe = ai.pop_safe_moves()
+        if safe:
+            safe = safe[:max_moves - moves]
+            lost, _ = game.handle_moves(safe, ai, revealed, flags)
+            moves += len(safe)
+        else:
+            move = ai.make_random_move()
+            if move is None:
+                break
+            lost, _ = game.handle_move(move, ai, revealed, flags)
+            moves += 1
+    elapsed = time.perf_counter() - start
+    return {
+        "height": game.height,
+        "width": game.width,
+        "density": density,
+        "seed": seed,
+        "moves": moves,
+        "revealed": len(revealed),
+        "lost": lost,
+        "chunks": len(game.chunks),
+        "knowledge": len(ai.knowledge),
+        "elapsed": elapsed,
+        "moves_per_sec": moves / elapsed if elapsed else 0.0,
+    }
+
+
+def format_report(report):
+    latency = report["latency"]
+    return "\n".join([
+        f"Board: {report['height']}x{report['width']}, {report['mines']} mines  "
+        f"Seed: {report['seed']}  Workers: {report['workers']}",
+        f"Games: {report['games']}  Wins: {report['wins']}  "
+        f"Win rate: {report['win_rate'] * 100:.2f}%",
+        f"Elapsed: {report['elapsed']:.2f} s  "
+        f"Games/sec: {report['games_per_sec']:.1f}  "
+        f"Moves/sec: {report['moves_per_sec']:.1f}",
+        f"Per-game latency (ms): mean {latency['mean'] * 1000:.2f}  "
+        f"p50 {latency['p50'] * 1000:.2f}  p90 {latency['p90'] * 1000:.2f}  "
+        f"p99 {latency['p99'] * 1000:.2f}  max {latency['max'] * 1000:.2f}",
+    ])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run headless Minesweeper AI games.")
+    parser.add_argument("-n", "--games", type=int, default=1000)
+    parser.add_argument("--height", type=int, default=None, help="default: 9 (unbounded with --explore)")
+    parser.add_argument("--width", type=int, default=None, help="default: 9 (unbounded with --explore)")
+    parser.add_argument("--mines", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=None,
+                        help="base seed; the same seed replays the same games")
+    parser.add_argument("-j", "--workers", type=int, default=1,
+                        help="worker processes (0 = one per CPU)")
+    parser.add_argument("--array", action="store_true",
+                        help="use the numpy-backed ArrayMinesweeper board")
+    parser.add_argument("--bitsets", action="store_true",
+                        help="encode AI sentences as integer bitmasks")
+    parser.add_argument("--compact", action="store_true",
+                        help="keep AI cell state in flat arrays to save memory")
+    parser.add_argument("--guess", choices=GUESS_STRATEGIES, default="probability",
+                        help="how the AI guesses when no safe move is known")
+    parser.add_argument("--patterns", metavar="FILE",
+                        help="pattern table to warm-load (and save after 1-worker runs)")
+    parser.add_argument("--explore", type=int, metavar="MOVES",
+                        help="play one long game on a lazily generated chunked board instead")
+    parser.add_argument("--density", type=float, default=0.2,
+                        help="mine density of the --explore board "
+                             f"(at least {MIN_UNBOUNDED_DENSITY} unless it is bounded)")
+    parser.add_argument("--chunk-size", type=int, default=32,
+                        help="chunk side of the --explore board")
+    parser.add_argument("--stats", metavar="FILE",
+                        help="instrument the AI and write solver statistics as JSON")
+    parser.add_argument("--record", metavar="FILE",
+                        help="write every game to a recording file (.gz to compress)")
+    parser.add_argument("--record-lost", action="store_true",
+                        help="with --record, keep only the games the AI lost")
+    parser.add_argument("--replay", metavar="FILE",
+                        help="replay a recording file instead of playing new games")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args(argv)
+
+    if args.replay is not None:
+        report = replay_file(args.replay, {"bitsets": args.bitsets, "compact": args.compact})
+        if args.json:
+            print(json.dumps(report, indent=2))
+        else:
+            print(
+                f"Replayed {report['games']} games ({report['moves']} moves, "
+                f"{report['mismatches']} mismatches) in {report['elapsed']:.2f} s  "
+                f"Moves/sec: {report['moves_per_sec']:.1f}"
+            )
+        return
+
+    if args.explore is not None:
+        unbounded = args.height is None or args.width is None
+        if unbounded and args.density < MIN_UNBOUNDED_DENSITY:
+            parser.error(f"--density must be at least {MIN_UNBOUNDED_DENSITY} on an "
+                         "unbounded board; give --height and --width for sparser boards")
+        report = explore(args.explore, args.density, args.seed, args.height, args.width,
+                         args.chunk_size, ai_options={"guess": args.guess})
+        if args.json:
+            print(json.dumps(report, indent=2))
+        else:
+            print(
+                f"Explored {report['revealed']} cells in {report['moves']} moves "
+                f"({report['chunks']} chunks, {'lost' if report['lost'] else 'alive'})  "
+                f"Seed: {report['seed']}  Elapsed: {report['elapsed']:.2f} s  "
+                f"Moves/sec: {report['moves_per_sec']:.1f}"
+            )
+        return
+    if args.height is None:
+        args.height = 9
+    if args.width is None:
+        args.width = 9
+
+    ai_options = {"bitsets": args.bitsets, "guess": args.guess, "compact": args.compact}
+    stats = SolverStats() if args.stats else None
+    record = RecordWriter(args.record) if args.record else None
+    try:
+        report = simulate(args.games, args.height, args.width, args.mines,
+                          seed=args.seed, workers=args.workers, array=args.array,
+                          ai_options=ai_options, patterns=args.patterns, stats=stats,
+                          record=record, record_lost=args.record_lost)
+    finally:
+        if record is not None:
+            record.close()
+    if stats is not None:
+        stats.save(args.stats)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(format_report(report))
+
+
+if __name__ == "__main__":
+    main()
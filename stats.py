@@ -0,0 +1,278 @@
+"""
+Solver instrumentation for MinesweeperAI.
+
+SolverStats.attach(ai) wraps the solver methods on that AI instance
+only. The class itself is never patched, so an AI without stats runs
+the plain methods and pays nothing for the instrumentation.
+
+Collected per attached AI, and summed over every AI attached to the
+same SolverStats:
+    - wall time of every call to add_knowledge, add_knowledge_bulk,
+      observe, propagate, make_random_move and probability_map,
+      reported as count/total/mean/p50/p90/p99/max
+    - per-move latency, from choosing a move (or a batch of safe
+      moves) through the game revealing it and the AI's inference,
+      recorded by simulate.play_game through record_move
+    - knowledge-base size after each add_knowledge or
+      add_knowledge_bulk call
+    - sentences compared by propagate() (MinesweeperAI.subset_checks)
+    - new safe cells and mines found per inference tier:
+      "single" (a sentence that is all safe or all mines on its own),
+      "subset" (the difference of two sentences), "pattern" (the
+      pattern table)
+    - safe moves handed out and guesses made (moves returned by
+      make_random_move, reported as random_moves)
+    - component cache counters
+
+Usage:
+    stats = SolverStats()
+    stats.attach(ai)
+    ... play ...
+    stats.finish(ai)
+    stats.save("stats.json")
+"""
+import json
+import time
+
+# Methods whose calls are timed
+TIMED = (
+    "add_knowledge",
+    "add_knowledge_bulk",
+    "observe",
+    "propagate",
+    "make_random_move",
+    "probability_map",
+)
+
+# Methods during which a new mark is credited to a tier. "propagate"
+# is resolved to "single" or, inside add_inference, to "subset";
+# marks made while recording a revealed cell are not inferences.
+TIERS = {
+    "record_reveal": "reveal",
+    "add_cell_sentence": "single",
+    "propagate": "propagate",
+    "apply_patterns": "pattern",
+}
+
+INFERENCE_TIERS = ("single", "subset", "pattern")
+
+
+def percentile(values, q):
+    """
+    Returns the q-th percentile (0-100) of an already sorted list
+    using the nearest-rank method.
+    """
+    if not values:
+        return 0.0
+    rank = max(0, min(len(values) - 1, int(round(q / 100 * len(values))) - 1))
+    return values[rank]
+
+
+def summarize_durations(samples):
+    samples = sorted(samples)
+    count = len(samples)
+    total = sum(samples)
+    return {
+        "count": count,
+        "total": total,
+        "mean": total / count if count else 0.0,
+        "p50": percentile(samples, 50),
+        "p90": percentile(samples, 90),
+        "p99": percentile(samples, 99),
+        "max": samples[-1] if samples else 0.0,
+    }
+
+
+class SolverStats():
+    """
+    Counters and timings for one or more MinesweeperAI instances.
+    """
+
+    def __init__(self):
+        self.games = 0
+        self.durations = {name: [] for name in TIMED}
+        self.move_latencies = []
+        self.knowledge_sizes = []
+        self.subset_checks = 0
+        self.inferences = dict.fromkeys(INFERENCE_TIERS, 0)
+        self.safe_moves = 0
+        self.random_moves = 0
+        self.cache = {}
+        self.tier = None
+
+    def attach(self, ai):
+        """
+        Instruments ai by setting wrappers as instance attributes, which
+        take precedence over the class methods for every call, including
+        the AI's calls to itself.
+        """
+        for name in TIMED:
+            self.wrap_timed(ai, name)
+        for name, tier in TIERS.items():
+            self.wrap_tier(ai, name, tier)
+        self.wrap_inference(ai)
+        self.wrap_marks(ai)
+        self.wrap_safe_moves(ai)
+        self.wrap_random_moves(ai)
+        return ai
+
+    def wrap_timed(self, ai, name):
+        method = getattr(ai, name)
+        samples = self.durations[name]
+        sizes = self.knowledge_sizes if name.startswith("add_knowledge") else None
+
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                samples.append(time.perf_counter() - start)
+                if sizes is not None:
+                    sizes.append(len(ai.knowledge))
+
+        setattr(ai, name, timed)
+
+    def wrap_tier(self, ai, name, tier):
+        method = getattr(ai, name)
+
+        def in_tier(*args, **kwargs):
+            previous = self.tier
+            self.tier = tier
+            try:
+                return method(*args, **kwargs)
+            finally:
+                self.tier = previous
+
+        setattr(ai, name, in_tier)
+
+    def wrap_inference(self, ai):
+        # Câu suy ra từ hiệu hai câu trong propagate() thuộc tầng "subset"
+        method = ai.add_inference
+
+        def add_inference(sentence):
+            if self.tier != "propagate":
+                return method(sentence)
+            self.tier = "subset"
+            try:
+                return method(sentence)
+            finally:
+                self.tier = "propagate"
+
+        ai.add_inference = add_inference
+
+    def wrap_marks(self, ai):
+        inferences = self.inferences
+        mark_mine = ai.mark_mine
+        mark_safe = ai.mark_safe
+
+        def credit():
+            tier = self.tier
+            if tier == "propagate":
+                tier = "single"
+            if tier in inferences:
+                inferences[tier] += 1
+
+        def counted_mine(cell):
+            if cell not in ai.mines:
+                credit()
+            mark_mine(cell)
+
+        def counted_safe(cell):
+            if cell not in ai.safes:
+                credit()
+            mark_safe(cell)
+
+        ai.mark_mine = counted_mine
+        ai.mark_safe = counted_safe
+
+    def wrap_safe_moves(self, ai):
+        pop_safe_moves = ai.pop_safe_moves
+
+        def counted():
+            moves = pop_safe_moves()
+            self.safe_moves += len(moves)
+            return moves
+
+        ai.pop_safe_moves = counted
+
+    def wrap_random_moves(self, ai):
+        # Lần gọi cuối trả về None (hết nước đi) không tính là một nước
+        make_random_move = ai.make_random_move
+
+        def counted():
+            move = make_random_move()
+            if move is not None:
+                self.random_moves += 1
+            return move
+
+        ai.make_random_move = counted
+
+    def record_move(self, seconds):
+        """
+        Records the latency of one move: choosing it and playing it,
+        including the inference the reveal triggers. A batch of safe
+        moves played together counts as one move.
+        """
+        self.move_latencies.append(seconds)
+
+    def finish(self, ai):
+        """
+        Adds the counters kept by ai itself once its game is over.
+        """
+        self.games += 1
+        self.subset_checks += ai.subset_checks
+        for key, value in ai.component_cache.stats().items():
+            if key != "size":
+                self.cache[key] = self.cache.get(key, 0) + value
+
+    def merge(self, other):
+        """
+        Adds the data of another SolverStats, e.g. from a worker process.
+        """
+        self.games += other.games
+        for name, samples in other.durations.items():
+            self.durations[name].extend(samples)
+        self.move_latencies.extend(other.move_latencies)
+        self.knowledge_sizes.extend(other.knowledge_sizes)
+        self.subset_checks += other.subset_checks
+        for tier, count in other.inferences.items():
+            self.inferences[tier] += count
+        self.safe_moves += other.safe_moves
+        self.random_moves += other.random_moves
+        for key, value in other.cache.items():
+            self.cache[key] = self.cache.get(key, 0) + value
+        return self
+
+    def summary(self, series=False):
+        """
+        Returns the statistics as a JSON-serializable dictionary; with
+        series=True the knowledge-base size after every call is included.
+        """
+        sizes = sorted(self.knowledge_sizes)
+        report = {
+            "games": self.games,
+            "calls": {name: summarize_durations(samples)
+                      for name, samples in self.durations.items()},
+            "move_latency": summarize_durations(self.move_latencies),
+            "knowledge_size": {
+                "mean": sum(sizes) / len(sizes) if sizes else 0.0,
+                "p50": percentile(sizes, 50),
+                "p90": percentile(sizes, 90),
+                "max": sizes[-1] if sizes else 0,
+            },
+            "subset_checks": self.subset_checks,
+            "inferences": dict(self.inferences),
+            "safe_moves": self.safe_moves,
+            "random_moves": self.random_moves,
+            "component_cache": dict(self.cache),
+        }
+        if series:
+            report["knowledge_size"]["series"] = list(self.knowledge_sizes)
+        return report
+
+    def to_json(self, series=False):
+        return json.dumps(self.summary(series), indent=2)
+
+    def save(self, path, series=False):
+        with open(path, "w") as f:
+            f.write(self.to_json(series))
@@ -0,0 +1,138 @@
+"""
+Brute-force checks of MinesweeperAI.probability_map on tiny boards.
+
+Every check enumerates all mine layouts consistent with the numbers
+revealed so far, straight from the board and independently of the AI's
+knowledge base, and compares the resulting mine probabilities with the
+solver's. Run with python -m pytest or python -m unittest.
+"""
+import itertools
+import random
+import unittest
+
+from game import Minesweeper
+from csp import MinesweeperAI
+from patterns import PatternTable
+
+TOLERANCE = 1e-9
+
+# AI variants whose probabilities must all agree with the enumeration
+AI_OPTIONS = [{}, {"bitsets": True}, {"compact": True}, {"patterns": PatternTable()}]
+
+
+def neighbours(cell, height, width):
+    i, j = cell
+    return [
+        (row, col)
+        for row in range(max(i - 1, 0), min(i + 2, height))
+        for col in range(max(j - 1, 0), min(j + 2, width))
+        if (row, col) != cell
+    ]
+
+
+def numbers_around(game, revealed):
+    # (neighbours, number) of every revealed cell
+    return [
+        (neighbours(cell, game.height, game.width), game.nearby_mines(cell))
+        for cell in revealed
+    ]
+
+
+def brute_force_total(game, revealed):
+    """
+    Returns {cell: mine probability} for every unrevealed cell, over all
+    placements of the game's mines consistent with the revealed numbers.
+    """
+    numbers = numbers_around(game, revealed)
+    cells = [
+        (i, j) for i in range(game.height) for j in range(game.width)
+        if (i, j) not in revealed
+    ]
+    counts = dict.fromkeys(cells, 0)
+    total = 0
+    for layout in itertools.combinations(cells, game.total_mines):
+        layout = set(layout)
+        if all(sum(c in layout for c in around) == n for around, n in numbers):
+            total += 1
+            for cell in layout:
+                counts[cell] += 1
+    return {cell: count / total for cell, count in counts.items()}
+
+
+def brute_force_frontier(game, revealed):
+    """
+    Returns {cell: mine probability} for the unrevealed neighbours of
+    revealed cells, over all their assignments consistent with the
+    revealed numbers (no global mine count).
+    """
+    numbers = numbers_around(game, revealed)
+    cells = sorted({c for around, _ in numbers for c in around if c not in revealed})
+    counts = dict.fromkeys(cells, 0)
+    total = 0
+    for bits in itertools.product((0, 1), repeat=len(cells)):
+        mines = {cell for cell, bit in zip(cells, bits) if bit}
+        if all(sum(c in mines for c in around) == n for around, n in numbers):
+            total += 1
+            for cell in mines:
+                counts[cell] += 1
+    return {cell: count / total for cell, count in counts.items()}
+
+
+def play(height, width, mines, seed, ai_options, total_mines):
+    """
+    Plays a seeded game one move at a time and yields (game, ai,
+    revealed) after every move that does not end the game.
+    """
+    rng = random.Random(seed)
+    game = Minesweeper(height=height, width=width, mines=mines, rng=rng)
+    ai = MinesweeperAI(height=height, width=width, rng=rng,
+                       total_mines=mines if total_mines else None, **ai_options)
+    revealed = set()
+    flags = set()
+    while True:
+        move = ai.make_safe_move()
+        if move is None:
+            move = ai.make_random_move()
+            if move is None:
+                return
+        lost, _ = game.handle_move(move, ai, revealed, flags)
+        if lost or len(revealed) == height * width - mines:
+            return
+        yield game, ai, revealed
+
+
+class ProbabilityTest(unittest.TestCase):
+
+    def assertProbabilities(self, expected, actual, context):
+        for cell, p in expected.items():
+            self.assertIn(cell, actual, context)
+            self.assertAlmostEqual(actual[cell], p, delta=TOLERANCE,
+                                   msg=f"{context} cell {cell}")
+
+    def test_with_total_mines(self):
+        checked = 0
+        for options in AI_OPTIONS:
+            for seed in range(25):
+                for game, ai, revealed in play(5, 5, 4, seed, options, True):
+                    context = f"options={options} seed={seed}"
+                    expected = brute_force_total(game, revealed)
+                    self.assertProbabilities(expected, ai.mine_probabilities(), context)
+                    checked += 1
+        self.assertGreater(checked, 0)
+
+    def test_without_total_mines(self):
+        checked = 0
+        for options in AI_OPTIONS:
+            for seed in range(25):
+                for game, ai, revealed in play(5, 5, 4, seed, options, False):
+                    probabilities, interior = ai.probability_map()
+                    self.assertIsNone(interior)
+                    expected = brute_force_frontier(game, revealed)
+                    context = f"options={options} seed={seed}"
+                    self.assertProbabilities(expected, probabilities, context)
+                    checked += 1
+        self.assertGreater(checked, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()